@@ -0,0 +1,71 @@
+import json
+import hashlib
+from datetime import datetime
+
+# Bump when the crew-log prompts change, so entries written from old prompts are regenerated
+CREW_LOG_VERSION = 1
+
+# Stored in place of a member name for the journey summary
+SUMMARY_KEY = ''
+
+def init_crew_log_table(conn):
+    """
+    Create the crew log table if it doesn't exist yet.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS crew_logs (
+            day TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            member TEXT NOT NULL,
+            text TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (day, fingerprint, member)
+        )
+    """)
+    conn.commit()
+
+def crew_log_fingerprint(day, crew_data, model_name):
+    """
+    Identify the inputs behind a day's crew logs.
+
+    Covers the crew (and its order), every stat and profile field the prompts
+    use, the model and the prompt version, so any change gives a new fingerprint.
+
+    Args:
+        day: The voyage day
+        crew_data: Output of plant_movement_viz.build_crew_data
+        model_name: Model the logs are generated with
+
+    Returns:
+        Hex digest
+    """
+    payload = [CREW_LOG_VERSION, model_name, str(day), list(crew_data.items())]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+def load_crew_logs(conn, day, fingerprint):
+    """
+    Saved entries for a day's inputs.
+
+    Returns:
+        Dict of member name (None for the summary) -> text
+    """
+    rows = conn.execute(
+        "SELECT member, text FROM crew_logs WHERE day = ? AND fingerprint = ?",
+        (str(day), fingerprint)
+    ).fetchall()
+    return {(None if member == SUMMARY_KEY else member): text for member, text in rows}
+
+def save_crew_log(conn, day, fingerprint, member, text):
+    """
+    Save one entry (member None for the summary), replacing any earlier version.
+
+    Entries for the same day made from other inputs are dropped; they're stale
+    once the day's data or the crew's profiles have moved on.
+    """
+    with conn:
+        conn.execute("DELETE FROM crew_logs WHERE day = ? AND fingerprint != ?", (str(day), fingerprint))
+        conn.execute(
+            "INSERT OR REPLACE INTO crew_logs (day, fingerprint, member, text, created_at) VALUES (?, ?, ?, ?, ?)",
+            (str(day), fingerprint, SUMMARY_KEY if member is None else member, text,
+             datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        )
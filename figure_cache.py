@@ -0,0 +1,139 @@
+import os
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+# Bump when the figure-building code changes, so stale entries are never served
+CACHE_VERSION = 4
+
+FIGURE_CACHE_DIR = ".wayfinder_cache"
+MAX_MEMORY_BYTES = 64 * 1024 * 1024
+MAX_DISK_BYTES = 512 * 1024 * 1024
+
+def figure_key(data, plants, options):
+    """
+    Content address for a rendered figure.
+
+    Args:
+        data: The movement rows being plotted, or a short identifier for them
+            such as (day, revision), which saves hashing every row
+        plants: List of plant names (order matters, it sets the colours)
+        options: Dict of rendering options
+
+    Returns:
+        Hex digest identifying the data, plant list and options
+    """
+    digest = hashlib.sha256()
+    if isinstance(data, pd.DataFrame):
+        digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    else:
+        digest.update(json.dumps(data, default=str).encode())
+    digest.update(json.dumps([CACHE_VERSION, list(plants), options], sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+class FigureCache:
+    """
+    Size-bounded LRU of rendered figures, spilling evicted entries to disk.
+
+    Entries are kept in memory as they were rendered (an HTML string, or a Plotly
+    figure ready to draw) and only serialized when they're spilled to disk.
+
+    Safe to share between sessions; every operation holds a lock.
+    """
+    def __init__(self, cache_dir=FIGURE_CACHE_DIR, max_memory_bytes=MAX_MEMORY_BYTES, max_disk_bytes=MAX_DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json.gz")
+
+    def get(self, key, codec=None):
+        """
+        Cached value for `key`, or None. Disk hits are promoted back into memory.
+
+        Args:
+            key: Key from figure_key
+            codec: What the value was stored with (see put)
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+
+        path = self._disk_path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                text = f.read()
+            # Mark as recently used so disk pruning keeps it
+            os.utime(path)
+        except (OSError, EOFError):
+            return None
+
+        value = codec.loads(text) if codec is not None else text
+        self.put(key, value, len(text), codec)
+        return value
+
+    def put(self, key, value, size=None, codec=None):
+        """
+        Store a rendered figure, evicting least recently used entries to disk.
+
+        Args:
+            key: Key from figure_key
+            value: The rendered figure
+            size: Its serialized size in bytes (defaults to len(value), for text)
+            codec: Object with dumps() and loads() (like json) to write the value to
+                disk and read it back, or None if the value is text already
+        """
+        size = len(value) if size is None else size
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                self._memory_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size, codec)
+            self._memory_bytes += size
+
+            # Keep at least the newest entry, even if it alone is over the limit
+            while self._memory_bytes > self.max_memory_bytes and len(self._entries) > 1:
+                old_key, (old_value, old_size, old_codec) = self._entries.popitem(last=False)
+                self._memory_bytes -= old_size
+                evicted.append((old_key, old_value, old_codec))
+
+        for old_key, old_value, old_codec in evicted:
+            self._spill(old_key, old_value, old_codec)
+
+    def _spill(self, key, value, codec=None):
+        """
+        Write an evicted entry to disk and prune the oldest files past the disk limit.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            # Write then rename, so readers never see a partial file
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                f.write(codec.dumps(value) if codec is not None else value)
+            os.replace(tmp_path, path)
+
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.json.gz'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+
+        total = sum(size for _, size, _ in files)
+        for _, size, file in files:
+            if total <= self.max_disk_bytes:
+                break
+            total -= size
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass  # Another session pruned it first
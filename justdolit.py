@@ -1,18 +1,22 @@
 # import packages
-import google.generativeai as genai
-from dotenv import load_dotenv, find_dotenv
+import time
+_imports_started = time.perf_counter()
 import os
 import streamlit as st
 import sqlite3
 import shutil
-import base64
 import html
+from contextlib import closing
 import streamlit.components.v1 as components
-import streamlit_javascript as st_javascript
-import pandas as pd
-from plant_movement_viz import display_movement_visualization, display_crew_logs
-import time
-from datetime import datetime
+from profile_generator import generate_profile
+from plant_images import PLANT_IMAGES_DIR, STOCK_IMAGE_PATH, remove_unused_photo, save_plant_photo, thumbnail_url
+from llm import get_model, PROFILE_MODEL
+from profiler import profiled, profiled_run, section, render_profiler_panel
+from movement_db import connect, database_id, movement_date_bounds, movements_revision, plant_stats
+from datetime import datetime, timedelta
+
+# pandas, Plotly and the Gemini SDK are imported by the sections that use them,
+# so the roster can be drawn before they've loaded
 
 # Initialize session states
 if 'selected_plant' not in st.session_state:
@@ -24,265 +28,90 @@ if 'clicked_plant_name' not in st.session_state:
 if 'selected_option' not in st.session_state:
     st.session_state.selected_option = "Create New Plant"
 
-def main():
-    # Ensure image directory exists
-    os.makedirs("plants_images", exist_ok=True)
-
-    # set up key
-    dotenv_path = find_dotenv()
-    load_dotenv(dotenv_path=dotenv_path)
-    key = os.getenv("KEY")
-    genai.configure(api_key=key)
-
-    # initialize session
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    chat = model.start_chat(history=[])
-
-    ##### DATABASE #####
-    # Database setup
-    conn = sqlite3.connect("plant_db.db", check_same_thread=False)
-    c = conn.cursor()
-
-    # Add title column if it doesn't exist
-    try:
-        c.execute("ALTER TABLE plants ADD COLUMN title TEXT")
-        conn.commit()
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS plants (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE,
-            personality TEXT,
-            vocation TEXT,
-            adventure TEXT,
-            vessel TEXT,
-            image_path TEXT,
-            title TEXT
-        )
-    """)
-    conn.commit()
-
-    # Ensure stock.jpg exists in plants_images directory
-    stock_image_path = "plants_images/stock.jpg"
-    if not os.path.exists(stock_image_path):
-        shutil.copy("stock.jpg", stock_image_path)
-
-    # Function to encode image to Base64
-    def encode_image(image_path):
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode("utf-8")
-
-    # Custom CSS for sidebar styling
-    st.markdown(
-        """
-        <style>
-            [data-testid="stSidebar"] {
-                background-color: #6B705C !important;
-                color: #FFFFFF;        
-            }
-            .title-container {
-                margin-bottom: 15px;
-                text-align: center;
-            }
-            .plant-container-wrapper {
-                display: flex;
-                overflow-x: auto;
-                justify-content: flex-start;
-                white-space: nowrap;
-                padding-bottom: 10px;
-                padding-left: 0;
-                margin-left: -1rem;
-                width: calc(100% + 2rem);
-                /* Hide scrollbars while keeping scroll functionality */
-                scrollbar-width: none; /* Firefox */
-                -ms-overflow-style: none; /* IE and Edge */
-            }
-            /* Hide scrollbar for Chrome, Safari and Opera */
-            .plant-container-wrapper::-webkit-scrollbar {
-                display: none;
-            }
-            /* Hide scrollbar for the component's iframe */
-            iframe {
-                scrollbar-width: none !important;
-                -ms-overflow-style: none !important;
-            }
-            iframe::-webkit-scrollbar {
-                display: none !important;
-            }
-            .plant-container {
-                display: inline-block;
-                min-width: 100px; /* Changed to min-width to ensure consistent sizing */
-                flex-shrink: 0; /* Prevent shrinking */
-                text-align: center;
-                margin: 0 10px;
-            }
-            .plant-image-container {
-                position: relative;
-                display: inline-block;
-            }
-            .plant-image {
-                width: 80px;
-                height: 80px;
-                border-radius: 50%;
-                border: 4px solid #A5A58D;
-                object-fit: cover;
-            }
-            .plant-name {
-                margin-top: 5px;
-                font-weight: bold;
-                text-align: center;
-            }
-            .add-icon {
-                width: 24px;
-                height: 24px;
-                background-color: white;
-                border-radius: 50%;
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                font-size: 18px;
-                font-weight: bold;
-                color: green;
-                position: absolute;
-                bottom: 0;
-                right: 0;
-                transform: translate(5%, 5%);
-                border: none;
-            }
-            /* Style the save button */
-            [data-testid="stSidebar"] .stButton button {
-                color: #6B705C !important;
-                background-color: white !important;
-                border-color: white !important;
-            }
-            
-            [data-testid="stSidebar"] .stButton button:hover {
-                color: #6B705C !important;
-                background-color: #f0f0f0 !important;
-                border-color: #f0f0f0 !important;
-            }
-
-                /* Style field titles */
-                [data-testid="stSidebar"] label {
-                    color: white !important;
-                    font-size: 1.1em !important;
-                    font-weight: bold !important;
-                    margin-bottom: 8px !important;
-                }
-
-                /* Make text inputs black */
-                [data-testid="stSidebar"] textarea {
-                    color: black !important;
-                    background-color: white !important;
-                }
-                [data-testid="stSidebar"] input[type="text"] {
-                    color: black !important;
-                    background-color: white !important;
-                }
-
-                /* Style placeholder text */
-                [data-testid="stSidebar"] textarea::placeholder,
-                [data-testid="stSidebar"] input[type="text"]::placeholder {
-                    color: #666666 !important;
-                    opacity: 0.8;
-                }
-
-                /* Center buttons container */
-                .buttons-container {
-                    display: flex;
-                    justify-content: center;
-                    align-items: center;
-                    gap: 10px;
-                    margin: 20px auto;
-                    width: 100%;
-                    flex-wrap: wrap;
-                }
-
-                /* Style buttons to be equal width */
-                [data-testid="stSidebar"] .element-container {
-                    width: 100%;
-                }
-
-                [data-testid="stSidebar"] .row-widget.stButton {
-                    text-align: center;
-                    display: inline-block;
-                }
-                
-                [data-testid="stSidebar"] .stButton button {
-                    color: #6B705C !important;
-                    background-color: white !important;
-                    border-color: white !important;
-                    min-width: 110px !important;
-                    padding: 0.5rem 1rem !important;
-                    margin: 0 5px !important;
-                    height: 40px !important;
-                    line-height: 1.2 !important;
-                    white-space: nowrap !important;
-                    display: inline-block !important;
-                }
-                
-                [data-testid="stSidebar"] .stButton button:hover {
-                    color: #6B705C !important;
-                    background-color: #f0f0f0 !important;
-                    border-color: #f0f0f0 !important;
-                }
-
-                /* Container for buttons */
-                .button-container {
-                    display: flex;
-                    justify-content: center;
-                    align-items: center;
-                    gap: 20px;
-                    margin: 20px auto;
-                    width: 100%;
-                }
+# Plants shown per page of the roster carousel
+ROSTER_PAGE_SIZE = 24
 
-                /* Remove any existing button margins and adjust container */
-                [data-testid="stSidebar"] [data-testid="stHorizontalBlock"] {
-                    gap: 20px;
-                    justify-content: center;
-                    margin: 0 auto;
-                }
+# Days shown in the Crew Stats trend charts
+TREND_DAYS = 30
 
-                [data-testid="stSidebar"] [data-testid="stHorizontalBlock"] [data-testid="column"] {
-                    flex: 0 1 auto;
-                    min-width: auto;
-                }
+def _roster_filter(search):
+    """
+    WHERE conditions and params that narrow the roster to a search term.
+    """
+    if not search:
+        return [], []
+    escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    pattern = f"%{escaped}%"
+    return ["(name LIKE ? ESCAPE '\\' OR title LIKE ? ESCAPE '\\')"], [pattern, pattern]
 
-                /* Style buttons */
-                [data-testid="stSidebar"] .stButton {
-                    margin: 0;
-                }
-                
-                [data-testid="stSidebar"] .stButton button {
-                    color: #6B705C !important;
-                    background-color: white !important;
-                    border-color: white !important;
-                    min-width: 110px !important;
-                    padding: 0.5rem 1rem !important;
-                    height: 40px !important;
-                    line-height: 1.2 !important;
-                    white-space: nowrap !important;
-                    margin: 0 !important;
-                }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+def count_plants(c, search=""):
+    """
+    Number of plants matching the roster search.
+    """
+    conditions, params = _roster_filter(search)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return c.execute(f"SELECT COUNT(*) FROM plants {where}", params).fetchone()[0]
 
-    st.markdown("<div class='title-container'><h2>🌱  Your Plant Crew</h2></div>", unsafe_allow_html=True)
+def fetch_plant_page(c, after=None, search="", limit=ROSTER_PAGE_SIZE):
+    """
+    One page of the roster in name order, starting after the name `after`.
 
-    plants = c.execute("SELECT name, image_path, title FROM plants ORDER BY name ASC").fetchall()
+    Uses keyset pagination on the unique name index, so later pages cost the same as the first.
 
-    if not plants:
-        st.error("❌ ERROR: No plants found in the database!")
+    Returns:
+        (rows of (name, image_path, title), whether another page follows)
+    """
+    conditions, params = _roster_filter(search)
+    if after is not None:
+        conditions.append("name > ?")
+        params.append(after)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = c.execute(
+        f"SELECT name, image_path, title FROM plants {where} ORDER BY name ASC LIMIT ?",
+        params + [limit + 1]
+    ).fetchall()
+    return rows[:limit], len(rows) > limit
+
+@st.fragment
+@profiled("Roster")
+def render_roster():
+    """
+    Searchable, paginated crew carousel. Searching and paging only rerun this section.
+    """
+    # Roster paging state: a stack of the names each visited page starts after
+    if 'roster_cursors' not in st.session_state:
+        st.session_state.roster_cursors = [None]
+
+    def reset_roster_pages():
+        st.session_state.roster_cursors = [None]
+
+    def previous_roster_page():
+        st.session_state.roster_cursors.pop()
+
+    def next_roster_page(last_name):
+        st.session_state.roster_cursors.append(last_name)
+
+    search = st.text_input("Search your crew",
+                           placeholder="🔍 Search by name or title",
+                           key="roster_search",
+                           on_change=reset_roster_pages,
+                           label_visibility="collapsed").strip()
+
+    with closing(connect()) as conn:
+        c = conn.cursor()
+        crew_size = count_plants(c, search)
+        plants, has_more = fetch_plant_page(c, after=st.session_state.roster_cursors[-1], search=search)
+
+    if not crew_size:
+        if search:
+            st.info(f"No pals match \"{search}\"")
+        else:
+            st.error("❌ ERROR: No plants found in the database!")
     else:
         st.markdown(
             f"""
             <div style="text-align: center; color: #666666; font-style: italic; margin-bottom: 20px;">
-                Your Crew Has {len(plants)} Pals
+                Your Crew Has {crew_size} Pals
             </div>
             """,
             unsafe_allow_html=True
@@ -382,22 +211,23 @@ def main():
                     <div class="plant-container-wrapper">
     """
 
-    # Loop through plants and add them to the HTML content
+    # Thumbnails are static URLs the browser fetches lazily as they scroll into view
+    plant_cards = []
     for plant_name, image_path, title in plants:
-        encoded_image = encode_image(image_path)
+        image_url = thumbnail_url(image_path if image_path and os.path.exists(image_path) else STOCK_IMAGE_PATH)
         title_display = title if title else "Wandering Plant"
 
-        html_content += f"""
+        plant_cards.append(f"""
             <div class="plant-container" data-plant-name="{html.escape(plant_name)}">
                 <div class="plant-image-container">
-                    <img src="data:image/png;base64,{encoded_image}" class="plant-image">
+                    <img src="{image_url}" class="plant-image" loading="lazy" decoding="async" width="80" height="80">
                 </div>
-                <p class="plant-name">{plant_name}</p>
-                <p class="plant-title">{title_display}</p>
+                <p class="plant-name">{html.escape(plant_name)}</p>
+                <p class="plant-title">{html.escape(title_display)}</p>
             </div>
-        """
+        """)
 
-    html_content += """
+    html_content += "".join(plant_cards) + """
                     </div>
                 </div>
             </div>
@@ -406,150 +236,173 @@ def main():
     """
     components.html(html_content, height=200, scrolling=True)
 
-    # Add stylized date section
-    def int_to_roman(num):
-        val = [1000, 900, 500, 400, 100, 90, 50, 40, 10, 9, 5, 4, 1]
-        syb = ["M", "CM", "D", "CD", "C", "XC", "L", "XL", "X", "IX", "V", "IV", "I"]
-        roman_num = ''
-        i = 0
-        while num > 0:
-            for _ in range(num // val[i]):
-                roman_num += syb[i]
-                num -= val[i]
-            i += 1
-        return roman_num
+    # Page through the roster
+    if len(st.session_state.roster_cursors) > 1 or has_more:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button("‹ Previous", key="roster_prev", use_container_width=True,
+                      disabled=len(st.session_state.roster_cursors) == 1,
+                      on_click=previous_roster_page)
+        with col3:
+            st.button("Next ›", key="roster_next", use_container_width=True,
+                      disabled=not has_more,
+                      on_click=next_roster_page, args=(plants[-1][0] if plants else None,))
+
+@st.fragment
+@profiled("Profile panel")
+def render_profile_panel(selected_plant):
+    """
+    Profile details for the selected plant.
+    """
+    if not selected_plant or selected_plant == "New":
+        return
 
-    today = datetime.now()
-    day_roman = int_to_roman(today.day)
-    year_roman = int_to_roman(today.year)
-    month_names = ["IANUARIUS", "FEBRUARIUS", "MARTIUS", "APRILIS", "MAIUS", "IUNIUS", 
-                    "IULIUS", "AUGUSTUS", "SEPTEMBER", "OCTOBER", "NOVEMBER", "DECEMBER"]
+    # Fetch plant details from database
+    with closing(connect()) as conn:
+        plant_details = conn.execute("""
+            SELECT name, personality, vocation, adventure, vessel 
+            FROM plants 
+            WHERE name = ?
+        """, (selected_plant,)).fetchone()
+    
+    if plant_details:
+        st.markdown("---")
+        st.markdown(f"### 🌿 {plant_details[0]}'s Profile")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Personality**")
+            st.write(plant_details[1] if plant_details[1] else "No personality set yet!")
+            
+            st.markdown("**Vocation**")
+            st.write(plant_details[2] if plant_details[2] else "No vocation set yet!")
+        
+        with col2:
+            st.markdown("**Vessel**")
+            st.write(plant_details[4] if plant_details[4] else "No vessel set yet!")
+            
+            st.markdown("**Adventure**")
+            st.write(plant_details[3] if plant_details[3] else "No adventure set yet!")
 
-    st.markdown(
-        f"""
-        <div style="text-align: center; margin: 20px 0; font-family: 'Times New Roman', serif;">
-            <div style="font-size: 12px; color: #6B705C; letter-spacing: 3px;">ANNO DOMINI</div>
-            <div style="font-size: 24px; color: #6B705C; font-weight: bold; letter-spacing: 5px; margin: 5px 0;">
-                {day_roman} • {month_names[today.month - 1]} • {year_roman}
-            </div>
-            <div style="font-size: 10px; color: #A5A58D; letter-spacing: 2px; font-style: italic;">
-                IN THE YEAR OF THE WANDERING PLANTS
-            </div>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-
-    # Display plant details if one is selected
-    if st.session_state.selected_plant and st.session_state.selected_plant != "New":
-        # Fetch plant details from database
-        plant_details = c.execute("""
-            SELECT name, personality, vocation, adventure, vessel 
-            FROM plants 
-            WHERE name = ?
-        """, (st.session_state.selected_plant,)).fetchone()
+@profiled("Wayfinder")
+def render_wayfinder(voyage_day, revision):
+    """
+    Animated paths for the selected day. Runs as a fragment, so it only reruns
+    when its inputs change, or on every refresh in live mode.
+    """
+    st.markdown("<h2 style='text-align: center;'>🧭 Wayfinder</h2>", unsafe_allow_html=True)
+    live = st.session_state.get("live_tracking")
+    renderer = st.radio("Animation", ["Frames", "Smooth (in browser)"],
+                        horizontal=True, key="wayfinder_renderer", disabled=live,
+                        help="Smooth mode sends each path once and animates it in the browser; best for large crews. "
+                             "It loads Plotly from cdn.plot.ly, so it needs internet access. "
+                             "Live mode always animates in the browser.")
+    show_light_map = st.toggle("☀️ Light map", key="wayfinder_light_map",
+                               help="Shade the patio by the mean UV level recorded in each spot.")
+    with section("Imports"):
+        from plant_movement_viz import display_movement_visualization
+        from live_telemetry import day_light_map, day_positions, refresh_movements
+    try:
+        if live:
+            # Ingest and process only what arrived since the last refresh; paths and
+            # the light map are extended incrementally
+            revision = refresh_movements()
+        movement_data = day_positions(voyage_day, revision)
+        plants = movement_data['Name'].unique().tolist()
+        # Frames are rebuilt from the whole day for every new revision, too slow to
+        # keep up with live refreshes; the browser renderer just encodes each path
+        display_movement_visualization(movement_data, plants, PLANT_IMAGES_DIR,
+                                       client_side=live or renderer == "Smooth (in browser)",
+                                       light_map=day_light_map(voyage_day, revision) if show_light_map else None,
+                                       data_key=(database_id(), voyage_day, revision))
+    except Exception as e:
+        st.error(f"Error displaying movement visualization: {str(e)}")
+
+@profiled("Crew stats")
+def render_crew_stats(voyage_day, revision):
+    """
+    Per-plant statistics for the selected day. Runs as a fragment, refreshed on an interval in live mode.
+    """
+    st.markdown("<h2 style='text-align: center;'>📊 Crew Stats</h2>", unsafe_allow_html=True)
+    try:
+        if st.session_state.get("live_tracking"):
+            from live_telemetry import refresh_movements
+            # New rows are folded into the running aggregates as they're ingested
+            refresh_movements()
+        # Read from the running per-plant aggregates rather than every row
+        with closing(connect()) as conn:
+            stats = plant_stats(conn, voyage_day, voyage_day)
+        stats = stats.rename(columns={
+            'distance_mean': 'Distance Traveled (in) (mean)',
+            'distance_max': 'Distance Traveled (in) (max)',
+            'rotation_mean': 'Rotation (°) (mean)',
+            'rotation_max': 'Rotation (°) (max)',
+            'uv_mean': 'UV Levels (%) (mean)',
+            'uv_max': 'UV Levels (%) (max)'
+        }).drop(columns=['count', 'distance_total']).round(2)
         
-        if plant_details:
-            st.markdown("---")
-            st.markdown(f"### 🌿 {plant_details[0]}'s Profile")
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown("**Personality**")
-                st.write(plant_details[1] if plant_details[1] else "No personality set yet!")
-                
-                st.markdown("**Vocation**")
-                st.write(plant_details[2] if plant_details[2] else "No vocation set yet!")
-            
-            with col2:
-                st.markdown("**Vessel**")
-                st.write(plant_details[4] if plant_details[4] else "No vessel set yet!")
-                
-                st.markdown("**Adventure**")
-                st.write(plant_details[3] if plant_details[3] else "No adventure set yet!")
+        # Display statistics
+        st.dataframe(stats, use_container_width=True)
 
-    # Add Movement Visualization Section
-    st.markdown("---")
-
-    # Movement Tracking Section
-    st.markdown("<h1 style='text-align: center;'>🌿 Your Crew's Log 🌿</h1>", unsafe_allow_html=True)
-
-    if 'show_tracking' not in st.session_state:
-        st.session_state.show_tracking = False
-
-    if not st.session_state.show_tracking:
-        col1, col2, col3 = st.columns([1, 2, 1])
-        with col2:
-            if st.button("🚀 Initialize Crew Tracking", use_container_width=True):
-                with st.spinner("🛰️ Establishing connection to tracking systems..."):
-                    st.empty()
-                    time.sleep(1)
-                with st.spinner("📍 Calibrating position sensors..."):
-                    st.empty()
-                    time.sleep(1)
-                with st.spinner("🌟 Activating crew monitoring..."):
-                    st.empty()
-                    time.sleep(1)
-                st.session_state.show_tracking = True
-                st.rerun()
+        with st.expander(f"📈 {TREND_DAYS}-day trends"):
+            render_crew_trends(voyage_day, stats.index.tolist())
+    except Exception as e:
+        st.error(f"Error loading crew statistics: {str(e)}")
 
-    if st.session_state.show_tracking:
-        # Create tabs
-        tab1, tab2, tab3 = st.tabs([
-            "🧭 Wayfinder",
-            "📊 Crew Stats",
-            "📝 Crew Logs"
-        ])
-        
-        with tab1:
-            st.markdown("<h2 style='text-align: center;'>🧭 Wayfinder</h2>", unsafe_allow_html=True)
-            if 'movements.csv' in os.listdir():
-                try:
-                    movement_data = pd.read_csv('movements.csv')
-                    plants = movement_data['Name'].unique().tolist()
-                    display_movement_visualization(movement_data, plants, "plants_images")
-                except Exception as e:
-                    st.error(f"Error displaying movement visualization: {str(e)}")
-        
-        with tab2:
-            st.markdown("<h2 style='text-align: center;'>📊 Crew Stats</h2>", unsafe_allow_html=True)
-            if 'movements.csv' in os.listdir():
-                try:
-                    movements_df = pd.read_csv('movements.csv')
-                    # Calculate statistics for each crew member
-                    stats = movements_df.groupby('Name').agg({
-                        'Distance Traveled (in)': ['mean', 'max'],
-                        'Rotation (°)': ['mean', 'max'],
-                        'UV Levels (%)': ['mean', 'max']
-                    }).round(2)
-                    
-                    # Flatten column names
-                    stats.columns = [f"{col[0]} ({col[1]})" for col in stats.columns]
-                    
-                    # Display statistics
-                    st.dataframe(stats, use_container_width=True)
-                except Exception as e:
-                    st.error(f"Error loading crew statistics: {str(e)}")
-        
-        with tab3:
-            if 'movements.csv' in os.listdir():
-                try:
-                    movement_data = pd.read_csv('movements.csv')
-                    crew_members = movement_data['Name'].unique().tolist()
-                    display_crew_logs(movement_data, crew_members)
-                except Exception as e:
-                    st.error(f"Error generating crew logs: {str(e)}")
-            else:
-                st.info("No movement data available yet. Start tracking your crew's journey to generate logs!")
+def render_crew_trends(voyage_day, crew_members):
+    """
+    Daily distance and UV over the days leading up to the selected one, read from
+    the archive's daily rollups so only the days (and plant) shown are loaded.
+    """
+    with section("Imports"):
+        from movement_archive import read_rollups
+    member = st.selectbox("Plant", ["Whole crew"] + crew_members, key="crew_trend_member")
+    daily = read_rollups('daily', voyage_day - timedelta(days=TREND_DAYS - 1), voyage_day,
+                         names=None if member == "Whole crew" else [member],
+                         columns=['day', 'uv_count', 'distance_total', 'uv_total', 'uv_max'])
+    if daily is None or daily.empty:
+        st.caption("Days are added here once they're over.")
+        return
+
+    # Sums combine across plants; means are recomputed from them
+    trend = daily.groupby('day').agg(uv_count=('uv_count', 'sum'), distance=('distance_total', 'sum'),
+                                     uv_total=('uv_total', 'sum'), uv_max=('uv_max', 'max'))
+    st.markdown("**Distance Traveled (in)**")
+    st.line_chart(trend['distance'])
+    st.markdown("**UV Levels (%)**")
+    st.line_chart(trend.assign(mean=trend['uv_total'] / trend['uv_count'])[['mean', 'uv_max']].rename(columns={'uv_max': 'max'}))
+
+@st.fragment
+@profiled("Crew logs")
+def render_crew_logs(voyage_day, revision):
+    """
+    Crew log generation for the selected day. Retrieving logs only reruns this section.
+    """
+    with section("Imports"):
+        from plant_movement_viz import display_crew_logs
+    try:
+        with closing(connect()) as conn:
+            crew_stats = plant_stats(conn, voyage_day, voyage_day)
+        crew_members = crew_stats.index.tolist()
+        display_crew_logs(crew_stats, crew_members, voyage_day)
+    except Exception as e:
+        st.error(f"Error generating crew logs: {str(e)}")
+
+@st.fragment
+@profiled("Sidebar editor")
+def render_sidebar_editor():
+    """
+    Roster Manager form. Typing and generating only rerun the sidebar; saving reruns the app.
+    """
+    with closing(connect()) as conn:
+        c = conn.cursor()
 
-    # Sidebar UI
-    with st.sidebar:
         st.markdown("<div class='title-container'><h1>🌿 Roster Manager 🌿</h1></div>", unsafe_allow_html=True)
-        
+    
         # Get all plants
         existing_plants = c.execute("SELECT name FROM plants ORDER BY name ASC").fetchall()
         plant_names = [plant[0] for plant in existing_plants]
-        
+    
         # Function to handle selectbox change
         def on_select_change():
             st.session_state.selected_option = st.session_state.select_plant
@@ -559,90 +412,90 @@ def main():
                         'temp_generated_content']:
                 if key in st.session_state:
                     del st.session_state[key]
-        
+    
         # Add "Create New Plant" option at the top
         options = ["Create New Plant"] + plant_names
-        
+    
         # Find the correct index, defaulting to 0 if not found
         try:
             current_index = options.index(st.session_state.selected_option)
         except ValueError:
             current_index = 0
             st.session_state.selected_option = "Create New Plant"
-        
+    
         selected_option = st.selectbox("Select a plant to edit or create new", 
                                         options, 
                                         key="select_plant",
                                         on_change=on_select_change,
                                         index=current_index)
-        
+    
         st.markdown("---")
-        
+    
         if selected_option == "Create New Plant":
             st.markdown("### 🌱 Create New Plant")
-            
+        
             # Display all form fields first
             plant_name_input = st.text_input("Your Pal's Name", 
                                             value=st.session_state.temp_generated_content.get('name', "") if 'temp_generated_content' in st.session_state else st.session_state.get('new_name', ""),
                                             placeholder="e.g. Elvis Parsley", 
                                             key="new_name")
-            
+        
             title_input = st.text_input("Their Title",
                                         value=st.session_state.temp_generated_content.get('title', "") if 'temp_generated_content' in st.session_state else st.session_state.get('new_title', ""),
                                         placeholder="e.g. Cosmic Navigator",
                                         key="new_title")
-            
+        
             image_upload = st.file_uploader("Your Pal's Photo", type=["jpg", "png", "jpeg"], key="new_photo")
-            
+        
             personality_input = st.text_area("Their Personality", 
                                             value=st.session_state.temp_generated_content.get('personality', "") if 'temp_generated_content' in st.session_state else st.session_state.get('new_personality', ""),
                                             placeholder="Are they adventurous? Or sassy?", 
                                             key="new_personality")
-            
+        
             vocation_input = st.text_area("Their Hustle", 
                                         value=st.session_state.temp_generated_content.get('vocation', "") if 'temp_generated_content' in st.session_state else st.session_state.get('new_vocation', ""),
                                         placeholder="What are they up? Are they a sailor, explorer, librarian?", 
                                         key="new_vocation")
-            
+        
             vessel_input = st.text_area("Their Ride", 
                                         value=st.session_state.temp_generated_content.get('vessel', "") if 'temp_generated_content' in st.session_state else st.session_state.get('new_vessel', ""),
                                         placeholder="What's your plant's sweet ride — a ship, a balloon?", 
                                         key="new_vessel")
-            
+        
             adventure_input = st.text_area("Their Ideal Adventure", 
                                             value=st.session_state.temp_generated_content.get('adventure', "") if 'temp_generated_content' in st.session_state else st.session_state.get('new_adventure', ""),
                                             placeholder="Describe an adventure that would make your pal smile.", 
                                             key="new_adventure")
-            
+        
             # Buttons row
             st.markdown('<div class="button-wrapper">', unsafe_allow_html=True)
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("Save Plant", key="save_btn", use_container_width=True):
                     if plant_name_input and personality_input and vocation_input and adventure_input and vessel_input:
-                        image_path = f"plants_images/{plant_name_input}.jpg" if image_upload else "plants_images/stock.jpg"
-                        
-                        if image_upload:
-                            with open(image_path, "wb") as f:
-                                f.write(image_upload.read())
-                        
+                        from PIL import Image
+                        try:
+                            # Shrunk, re-encoded and stored once however many plants share it
+                            image_path = save_plant_photo(image_upload.getvalue()) if image_upload else STOCK_IMAGE_PATH
+                        except (OSError, Image.DecompressionBombError):
+                            st.error("That photo couldn't be read. Try a JPG or PNG.")
+                            return
+                    
                         c.execute("INSERT INTO plants (name, personality, vocation, adventure, vessel, image_path, title) VALUES (?, ?, ?, ?, ?, ?, ?)",
                                 (plant_name_input, personality_input, vocation_input, adventure_input, vessel_input, image_path, title_input))
                         conn.commit()
-                        
+                    
                         # Clear session states
                         for key in ['new_name', 'new_title', 'new_personality', 'new_vocation', 'new_vessel', 'new_adventure', 'new_photo', 'temp_generated_content']:
                             if key in st.session_state:
                                 del st.session_state[key]
-                        
+                    
                         st.rerun()
                     else:
                         st.error("Hold on! We need more info about your pal!")
-            
+        
             with col2:
                 if st.button("Help Me ✨", key="help_btn", use_container_width=True):
-                    st.info("🔍 Starting content generation...")
-                    
                     # Store current values and preserve them in generated content
                     current_values = {
                         'name': plant_name_input,
@@ -655,65 +508,16 @@ def main():
 
                     # Initialize temporary content with current non-empty values
                     generated_content = {k: v for k, v in current_values.items() if v}
+                
+                    # Only generate content for empty fields, all in one request
+                    with st.spinner("✨ Generating your pal's profile..."):
+                        generated_content.update(generate_profile(get_model(PROFILE_MODEL, site="profile"), current_values))
                     
-                    # Create prompt based on existing context
-                    context_prompt = "Create a character with the following details. Focus on creating a believable persona that could be from any genre of fictional work - sci-fi, fantasy, detective, romance, or literary fiction. Always provide definitive statements, never questions. The character should maintain consistent identity and personality traits throughout all descriptions. "
-                    if generated_content:
-                        context_prompt += "Maintain consistency with these existing traits:\n"
-                        for key, value in generated_content.items():
-                            context_prompt += f"- {key}: {value}\n"
-                    
-                    # Only generate content for empty fields
-                    if not plant_name_input:
-                        name_response = chat.send_message(
-                            f"{context_prompt}Generate a character name that would fit in a fictional book of any genre - sci-fi, fantasy, detective, romance, or literary fiction. The name should reflect their background and personality. Respond with just the name, no explanation."
-                        )
-                        generated_content['name'] = name_response.text.strip()
-                    
-                    if not title_input:
-                        st.info("✨ Generating new title...")
-                        title_response = chat.send_message(
-                            f"{context_prompt}Generate a title or epithet (2-4 words) that reflects their role or nature (e.g. 'Cosmic Navigator', 'Keeper of Ancient Whispers'). The title should be poetic and mysterious while staying true to the character's established identity. Respond with just the title, no explanation."
-                        )
-                        generated_content['title'] = title_response.text.strip()
-                        context_prompt += f"\n- title: {generated_content['title']}"
-                    
-                    if not personality_input:
-                        st.info("✨ Generating personality...")
-                        personality_response = chat.send_message(
-                            f"{context_prompt}Write a compelling description of {plant_name_input}'s personality in 2-3 clear sentences. Focus on their unique traits, quirks, and what makes them memorable, while maintaining consistency with their name and title."
-                        )
-                        generated_content['personality'] = personality_response.text.strip()
-                        context_prompt += f"\n- personality: {generated_content['personality']}"
-                    
-                    if not vocation_input:
-                        st.info("✨ Generating vocation...")
-                        vocation_response = chat.send_message(
-                            f"{context_prompt}Describe {plant_name_input}'s profession or calling in 2-3 clear sentences. Focus on what they do and why they're passionate about it, ensuring it aligns with their established personality and title."
-                        )
-                        generated_content['vocation'] = vocation_response.text.strip()
-                        context_prompt += f"\n- vocation: {generated_content['vocation']}"
-                    
-                    if not vessel_input:
-                        st.info("✨ Generating vessel...")
-                        vessel_response = chat.send_message(
-                            f"{context_prompt}Describe {plant_name_input}'s signature mode of transport in 2-3 clear sentences. It can be unconventional. Make it unique and fitting to their established personality, title, and vocation."
-                        )
-                        generated_content['vessel'] = vessel_response.text.strip()
-                        context_prompt += f"\n- vessel: {generated_content['vessel']}"
-                    
-                    if not adventure_input:
-                        st.info("✨ Generating adventure...")
-                        adventure_response = chat.send_message(
-                            f"{context_prompt}Tell a defining adventure or moment in {plant_name_input}'s life in 2-3 clear sentences. Make it exciting and revealing while incorporating their established traits, title, and vocation."
-                        )
-                        generated_content['adventure'] = adventure_response.text.strip()
-                        
-                    # Store generated content and rerun once at the end
+                    # Store generated content and rerun the sidebar once at the end
                     st.session_state.temp_generated_content = generated_content
-                    st.rerun()
+                    st.rerun(scope="fragment")
             st.markdown('</div>', unsafe_allow_html=True)
-        
+    
         else:  # Edit existing plant
             # Fetch current plant details
             plant_details = c.execute("""
@@ -721,7 +525,7 @@ def main():
                 FROM plants 
                 WHERE name = ?
             """, (selected_option,)).fetchone()
-            
+        
             if plant_details:
                 st.markdown("### ✏️ Edit Plant")
                 plant_name_input = st.text_input("Name", 
@@ -730,7 +534,7 @@ def main():
                 title_input = st.text_input("Title",
                                                 value=st.session_state.temp_generated_content.get('title', plant_details[6]) if 'temp_generated_content' in st.session_state else plant_details[6],
                                                 key="edit_title")
-                
+            
                 # Show current image centered
                 current_image = plant_details[5]
                 if current_image and os.path.exists(current_image):
@@ -739,7 +543,7 @@ def main():
                         st.image(current_image, width=100, caption="Current Photo")
                 else:
                     st.info("No current photo")
-                
+            
                 image_upload = st.file_uploader("Update Photo (clear to use default)", type=["jpg", "png", "jpeg"], key="edit_photo")
                 personality_input = st.text_area("Personality", 
                                                 value=st.session_state.temp_generated_content.get('personality', plant_details[1]) if 'temp_generated_content' in st.session_state else plant_details[1], 
@@ -753,7 +557,7 @@ def main():
                 adventure_input = st.text_area("Adventure", 
                                                 value=st.session_state.temp_generated_content.get('adventure', plant_details[3]) if 'temp_generated_content' in st.session_state else plant_details[3],
                                                 key="edit_adventure")
-                
+            
                 # Buttons container
                 st.markdown('<div class="button-wrapper">', unsafe_allow_html=True)
                 col1, col2, col3 = st.columns(3)
@@ -762,12 +566,15 @@ def main():
                         if plant_name_input and personality_input and vocation_input and adventure_input and vessel_input:
                             # Handle image update
                             if image_upload:
-                                image_path = f"plants_images/{plant_name_input}.jpg"
-                                with open(image_path, "wb") as f:
-                                    f.write(image_upload.read())
+                                from PIL import Image
+                                try:
+                                    image_path = save_plant_photo(image_upload.getvalue())
+                                except (OSError, Image.DecompressionBombError):
+                                    st.error("That photo couldn't be read. Try a JPG or PNG.")
+                                    return
                             else:
                                 image_path = plant_details[5]  # Keep existing image if no new upload
-                            
+                        
                             try:
                                 # Update the plant in database
                                 c.execute("""
@@ -777,7 +584,9 @@ def main():
                                 """, (plant_name_input, personality_input, vocation_input, adventure_input, 
                                         vessel_input, image_path, title_input, selected_option))
                                 conn.commit()
-                                
+                                if image_path != plant_details[5]:
+                                    remove_unused_photo(c, plant_details[5])
+                            
                                 # Update the selected option to the new name
                                 st.session_state.selected_option = plant_name_input
                                 st.rerun()
@@ -787,7 +596,6 @@ def main():
                 with col2:
                     if st.button("Help Me ✨", key="edit_help_btn", use_container_width=True):
                         try:
-                            # Build context from all existing non-empty fields
                             existing_traits = {
                                 'name': plant_name_input,
                                 'title': title_input,
@@ -796,57 +604,15 @@ def main():
                                 'vessel': vessel_input,
                                 'adventure': adventure_input
                             }
-                            
-                            # Filter out empty values and build context
-                            context = "Create content for a character with these existing traits:\n"
-                            for trait, value in existing_traits.items():
-                                if value and value.strip():
-                                    context += f"- {trait}: {value}\n"
-                            
-                            context += "\nMaintain absolute consistency with these established traits when generating new content. The character should feel like a cohesive individual whose traits all connect logically."
-                            
-                            # Initialize temporary storage for generated content
-                            temp_generated_content = {}
-                            
-                            # Generate content for empty fields
-                            if not personality_input or personality_input.strip() == "":
-                                personality_response = chat.send_message(
-                                    f"{context}\nWrite a compelling description of their personality in 2-3 clear sentences. Focus on their unique traits, quirks, and what makes them memorable, but consistent with their other established characteristics."
-                                )
-                                temp_generated_content['personality'] = personality_response.text.strip()
-                                context += f"\n- personality: {temp_generated_content['personality']}"
-                            
-                            if not vocation_input or vocation_input.strip() == "":
-                                vocation_response = chat.send_message(
-                                    f"{context}\nDescribe their profession or calling in 2-3 clear sentences. This should align with their established traits and explain how it fits their character."
-                                )
-                                temp_generated_content['vocation'] = vocation_response.text.strip()
-                                context += f"\n- vocation: {temp_generated_content['vocation']}"
-                            
-                            if not vessel_input or vessel_input.strip() == "":
-                                vessel_response = chat.send_message(
-                                    f"{context}\nDescribe their signature mode of transport in 2-3 clear sentences, it can be an unconventional mode of transport. Make it a natural extension of their established character and activities."
-                                )
-                                temp_generated_content['vessel'] = vessel_response.text.strip()
-                                context += f"\n- vessel: {temp_generated_content['vessel']}"
-                            
-                            if not adventure_input or adventure_input.strip() == "":
-                                adventure_response = chat.send_message(
-                                    f"{context}\nTell a defining adventure or moment in their life in 2-3 clear sentences. Make it exciting and this should showcase how their established traits come together in action."
-                                )
-                                temp_generated_content['adventure'] = adventure_response.text.strip()
-                                context += f"\n- adventure: {temp_generated_content['adventure']}"
-                            
-                            if not title_input or title_input.strip() == "":
-                                title_response = chat.send_message(
-                                    f"{context}\nGenerate a title or epithet (2-4 words) that reflects their role or nature (e.g. 'Cosmic Navigator', 'Keeper of Ancient Whispers'). The title should be poetic and mysterious while staying true to the character's established identity. Respond with just the title, no explanation."
-                                )
-                                temp_generated_content['title'] = title_response.text.strip()
-                            
+                        
+                            # Generate content for empty fields in one request
+                            with st.spinner("✨ Generating..."):
+                                temp_generated_content = generate_profile(get_model(PROFILE_MODEL, site="profile"), existing_traits)
+                        
                             # Store generated content in session state for next rerun
                             st.session_state.temp_generated_content = temp_generated_content
-                            st.rerun()
-                            
+                            st.rerun(scope="fragment")
+                        
                         except Exception as e:
                             st.error(f"Error in content generation process: {str(e)}")
 
@@ -856,7 +622,8 @@ def main():
                             # Delete the plant from database
                             c.execute("DELETE FROM plants WHERE name=?", (selected_option,))
                             conn.commit()
-                            
+                            remove_unused_photo(c, plant_details[5])
+                        
                             # Reset to Create New Plant after deletion
                             st.session_state.selected_option = "Create New Plant"
                             st.rerun()
@@ -864,5 +631,363 @@ def main():
                             st.error(f"Error deleting plant: {str(e)}")
                 st.markdown('</div>', unsafe_allow_html=True)
 
+def main():
+    # Ensure image directory exists
+    os.makedirs(PLANT_IMAGES_DIR, exist_ok=True)
+
+    ##### DATABASE #####
+    # Database setup
+    with closing(connect()) as conn:
+        c = conn.cursor()
+
+        # Add title column if it doesn't exist
+        try:
+            c.execute("ALTER TABLE plants ADD COLUMN title TEXT")
+            conn.commit()
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS plants (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE,
+                personality TEXT,
+                vocation TEXT,
+                adventure TEXT,
+                vessel TEXT,
+                image_path TEXT,
+                title TEXT
+            )
+        """)
+        conn.commit()
+
+    # Ensure stock.jpg exists in plants_images directory
+    if not os.path.exists(STOCK_IMAGE_PATH):
+        shutil.copy("stock.jpg", STOCK_IMAGE_PATH)
+
+    # Custom CSS for sidebar styling
+    st.markdown(
+        """
+        <style>
+            [data-testid="stSidebar"] {
+                background-color: #6B705C !important;
+                color: #FFFFFF;        
+            }
+            .title-container {
+                margin-bottom: 15px;
+                text-align: center;
+            }
+            .plant-container-wrapper {
+                display: flex;
+                overflow-x: auto;
+                justify-content: flex-start;
+                white-space: nowrap;
+                padding-bottom: 10px;
+                padding-left: 0;
+                margin-left: -1rem;
+                width: calc(100% + 2rem);
+                /* Hide scrollbars while keeping scroll functionality */
+                scrollbar-width: none; /* Firefox */
+                -ms-overflow-style: none; /* IE and Edge */
+            }
+            /* Hide scrollbar for Chrome, Safari and Opera */
+            .plant-container-wrapper::-webkit-scrollbar {
+                display: none;
+            }
+            /* Hide scrollbar for the component's iframe */
+            iframe {
+                scrollbar-width: none !important;
+                -ms-overflow-style: none !important;
+            }
+            iframe::-webkit-scrollbar {
+                display: none !important;
+            }
+            .plant-container {
+                display: inline-block;
+                min-width: 100px; /* Changed to min-width to ensure consistent sizing */
+                flex-shrink: 0; /* Prevent shrinking */
+                text-align: center;
+                margin: 0 10px;
+            }
+            .plant-image-container {
+                position: relative;
+                display: inline-block;
+            }
+            .plant-image {
+                width: 80px;
+                height: 80px;
+                border-radius: 50%;
+                border: 4px solid #A5A58D;
+                object-fit: cover;
+            }
+            .plant-name {
+                margin-top: 5px;
+                font-weight: bold;
+                text-align: center;
+            }
+            .add-icon {
+                width: 24px;
+                height: 24px;
+                background-color: white;
+                border-radius: 50%;
+                display: flex;
+                justify-content: center;
+                align-items: center;
+                font-size: 18px;
+                font-weight: bold;
+                color: green;
+                position: absolute;
+                bottom: 0;
+                right: 0;
+                transform: translate(5%, 5%);
+                border: none;
+            }
+            /* Style the save button */
+            [data-testid="stSidebar"] .stButton button {
+                color: #6B705C !important;
+                background-color: white !important;
+                border-color: white !important;
+            }
+            
+            [data-testid="stSidebar"] .stButton button:hover {
+                color: #6B705C !important;
+                background-color: #f0f0f0 !important;
+                border-color: #f0f0f0 !important;
+            }
+
+                /* Style field titles */
+                [data-testid="stSidebar"] label {
+                    color: white !important;
+                    font-size: 1.1em !important;
+                    font-weight: bold !important;
+                    margin-bottom: 8px !important;
+                }
+
+                /* Make text inputs black */
+                [data-testid="stSidebar"] textarea {
+                    color: black !important;
+                    background-color: white !important;
+                }
+                [data-testid="stSidebar"] input[type="text"] {
+                    color: black !important;
+                    background-color: white !important;
+                }
+
+                /* Style placeholder text */
+                [data-testid="stSidebar"] textarea::placeholder,
+                [data-testid="stSidebar"] input[type="text"]::placeholder {
+                    color: #666666 !important;
+                    opacity: 0.8;
+                }
+
+                /* Center buttons container */
+                .buttons-container {
+                    display: flex;
+                    justify-content: center;
+                    align-items: center;
+                    gap: 10px;
+                    margin: 20px auto;
+                    width: 100%;
+                    flex-wrap: wrap;
+                }
+
+                /* Style buttons to be equal width */
+                [data-testid="stSidebar"] .element-container {
+                    width: 100%;
+                }
+
+                [data-testid="stSidebar"] .row-widget.stButton {
+                    text-align: center;
+                    display: inline-block;
+                }
+                
+                [data-testid="stSidebar"] .stButton button {
+                    color: #6B705C !important;
+                    background-color: white !important;
+                    border-color: white !important;
+                    min-width: 110px !important;
+                    padding: 0.5rem 1rem !important;
+                    margin: 0 5px !important;
+                    height: 40px !important;
+                    line-height: 1.2 !important;
+                    white-space: nowrap !important;
+                    display: inline-block !important;
+                }
+                
+                [data-testid="stSidebar"] .stButton button:hover {
+                    color: #6B705C !important;
+                    background-color: #f0f0f0 !important;
+                    border-color: #f0f0f0 !important;
+                }
+
+                /* Container for buttons */
+                .button-container {
+                    display: flex;
+                    justify-content: center;
+                    align-items: center;
+                    gap: 20px;
+                    margin: 20px auto;
+                    width: 100%;
+                }
+
+                /* Remove any existing button margins and adjust container */
+                [data-testid="stSidebar"] [data-testid="stHorizontalBlock"] {
+                    gap: 20px;
+                    justify-content: center;
+                    margin: 0 auto;
+                }
+
+                [data-testid="stSidebar"] [data-testid="stHorizontalBlock"] [data-testid="column"] {
+                    flex: 0 1 auto;
+                    min-width: auto;
+                }
+
+                /* Style buttons */
+                [data-testid="stSidebar"] .stButton {
+                    margin: 0;
+                }
+                
+                [data-testid="stSidebar"] .stButton button {
+                    color: #6B705C !important;
+                    background-color: white !important;
+                    border-color: white !important;
+                    min-width: 110px !important;
+                    padding: 0.5rem 1rem !important;
+                    height: 40px !important;
+                    line-height: 1.2 !important;
+                    white-space: nowrap !important;
+                    margin: 0 !important;
+                }
+        </style>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    st.markdown("<div class='title-container'><h2>🌱  Your Plant Crew</h2></div>", unsafe_allow_html=True)
+
+    render_roster()
+
+    # Add stylized date section
+    def int_to_roman(num):
+        val = [1000, 900, 500, 400, 100, 90, 50, 40, 10, 9, 5, 4, 1]
+        syb = ["M", "CM", "D", "CD", "C", "XC", "L", "XL", "X", "IX", "V", "IV", "I"]
+        roman_num = ''
+        i = 0
+        while num > 0:
+            for _ in range(num // val[i]):
+                roman_num += syb[i]
+                num -= val[i]
+            i += 1
+        return roman_num
+
+    today = datetime.now()
+    day_roman = int_to_roman(today.day)
+    year_roman = int_to_roman(today.year)
+    month_names = ["IANUARIUS", "FEBRUARIUS", "MARTIUS", "APRILIS", "MAIUS", "IUNIUS", 
+                    "IULIUS", "AUGUSTUS", "SEPTEMBER", "OCTOBER", "NOVEMBER", "DECEMBER"]
+
+    st.markdown(
+        f"""
+        <div style="text-align: center; margin: 20px 0; font-family: 'Times New Roman', serif;">
+            <div style="font-size: 12px; color: #6B705C; letter-spacing: 3px;">ANNO DOMINI</div>
+            <div style="font-size: 24px; color: #6B705C; font-weight: bold; letter-spacing: 5px; margin: 5px 0;">
+                {day_roman} • {month_names[today.month - 1]} • {year_roman}
+            </div>
+            <div style="font-size: 10px; color: #A5A58D; letter-spacing: 2px; font-style: italic;">
+                IN THE YEAR OF THE WANDERING PLANTS
+            </div>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+    render_profile_panel(st.session_state.selected_plant)
+
+    # Add Movement Visualization Section
+    st.markdown("---")
+
+    # Movement Tracking Section
+    st.markdown("<h1 style='text-align: center;'>🌿 Your Crew's Log 🌿</h1>", unsafe_allow_html=True)
+
+    if 'show_tracking' not in st.session_state:
+        st.session_state.show_tracking = False
+
+    if not st.session_state.show_tracking:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            if st.button("🚀 Initialize Crew Tracking", use_container_width=True):
+                with st.spinner("🛰️ Establishing connection to tracking systems..."):
+                    st.empty()
+                    time.sleep(1)
+                with st.spinner("📍 Calibrating position sensors..."):
+                    st.empty()
+                    time.sleep(1)
+                with st.spinner("🌟 Activating crew monitoring..."):
+                    st.empty()
+                    time.sleep(1)
+                st.session_state.show_tracking = True
+                st.rerun()
+
+    if st.session_state.show_tracking:
+        from live_telemetry import LIVE_REFRESH_SECONDS, refresh_movements, start_telemetry_server
+
+        # Local endpoint robots can POST rows to, if SUNRUN_TELEMETRY_PORT is set
+        start_telemetry_server()
+
+        # Pull any rows appended to the CSV drop into the database
+        with section("Ingest"):
+            try:
+                revision = refresh_movements()
+            except Exception as e:
+                st.error(f"Error reading new movement data: {str(e)}")
+                revision = None
+
+        with closing(connect()) as conn:
+            if revision is None:
+                # Carry on with the rows already stored
+                revision = movements_revision(conn)
+
+            # Compact finished days into the columnar archive behind multi-day views
+            with section("Archive"):
+                from movement_archive import compact_movements
+                compact_movements(conn)
+
+            # Only the selected day is loaded, however long the history gets
+            first_day, last_day = movement_date_bounds(conn)
+        if last_day is None:
+            st.info("No movement data available yet. Start tracking your crew's journey to generate logs!")
+        else:
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col2:
+                voyage_day = st.date_input("📅 Voyage Date", value=last_day,
+                                           min_value=first_day, max_value=last_day,
+                                           key="voyage_day")
+                live = st.toggle("📡 Live", key="live_tracking",
+                                 help=f"Refresh the Wayfinder and Crew Stats every {LIVE_REFRESH_SECONDS} seconds with newly arrived rows.")
+            run_every = LIVE_REFRESH_SECONDS if live else None
+
+            # Create tabs
+            tab1, tab2, tab3 = st.tabs([
+                "🧭 Wayfinder",
+                "📊 Crew Stats",
+                "📝 Crew Logs"
+            ])
+
+            # Each tab is a fragment, so interacting with one doesn't rebuild the others;
+            # in live mode the Wayfinder and Crew Stats also rerun on their own timer
+            with tab1:
+                st.fragment(render_wayfinder, run_every=run_every)(voyage_day, revision)
+            with tab2:
+                st.fragment(render_crew_stats, run_every=run_every)(voyage_day, revision)
+            with tab3:
+                render_crew_logs(voyage_day, revision)
+
+    # Sidebar UI
+    with st.sidebar:
+        render_sidebar_editor()
+
 if __name__ == "__main__":
-    main()
+    # Opt-in timings of each section and query (SUNRUN_PROFILE=1 or ?profile=1)
+    with profiled_run("app", imports_started=_imports_started):
+        main()
+    render_profiler_panel()
@@ -0,0 +1,117 @@
+import numpy as np
+
+# Side of one light map cell, in the same units as the Wayfinder (inches)
+CELL_SIZE = 2.0
+
+class UVGrid:
+    """
+    Mean and maximum UV level per square cell of the patio.
+
+    Readings are binned by where the plant was when it took them. The grid grows
+    to cover new positions, so rows can be added in batches as they arrive.
+    """
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.origin = (0, 0)  # Cell index (x, y) of sums[0, 0]
+        self.sums = np.zeros((0, 0))
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+        self.maxima = np.zeros((0, 0))
+        self.rows = 0
+
+    def _grow(self, ix_min, ix_max, iy_min, iy_max):
+        """
+        Pad the arrays so they cover the given cell index ranges.
+        """
+        height, width = self.counts.shape
+        ox, oy = self.origin
+        if height and width:
+            ix_min, ix_max = min(ix_min, ox), max(ix_max, ox + width - 1)
+            iy_min, iy_max = min(iy_min, oy), max(iy_max, oy + height - 1)
+        new_shape = (iy_max - iy_min + 1, ix_max - ix_min + 1)
+        if new_shape == (height, width):
+            return
+
+        # Rows are y, columns are x, matching go.Heatmap's z layout
+        sums = np.zeros(new_shape)
+        counts = np.zeros(new_shape, dtype=np.int64)
+        maxima = np.full(new_shape, -np.inf)
+        if height and width:
+            rows = slice(oy - iy_min, oy - iy_min + height)
+            cols = slice(ox - ix_min, ox - ix_min + width)
+            sums[rows, cols] = self.sums
+            counts[rows, cols] = self.counts
+            maxima[rows, cols] = self.maxima
+        self.sums, self.counts, self.maxima = sums, counts, maxima
+        self.origin = (ix_min, iy_min)
+
+    def add(self, x, y, uv):
+        """
+        Bin a batch of readings taken at positions (x, y).
+
+        Args:
+            x, y: Array-likes of positions
+            uv: Array-like of UV levels, the same length as x and y
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        uv = np.asarray(uv, dtype=np.float64)
+        valid = np.isfinite(x) & np.isfinite(y) & np.isfinite(uv)
+        x, y, uv = x[valid], y[valid], uv[valid]
+        if len(uv) == 0:
+            return
+
+        ix = np.floor(x / self.cell_size).astype(np.int64)
+        iy = np.floor(y / self.cell_size).astype(np.int64)
+        self._grow(ix.min(), ix.max(), iy.min(), iy.max())
+
+        height, width = self.counts.shape
+        flat = (iy - self.origin[1]) * width + (ix - self.origin[0])
+        self.sums += np.bincount(flat, weights=uv, minlength=height * width).reshape(height, width)
+        self.counts += np.bincount(flat, minlength=height * width).reshape(height, width)
+
+        # Per-cell maximum: sort by cell, then reduce each run of equal cells
+        order = np.argsort(flat, kind='stable')
+        flat, uv = flat[order], uv[order]
+        starts = np.flatnonzero(np.r_[True, flat[1:] != flat[:-1]])
+        cells = flat[starts]
+        maxima = self.maxima.reshape(-1)
+        maxima[cells] = np.maximum(maxima[cells], np.maximum.reduceat(uv, starts))
+
+        self.rows += len(uv)
+
+    def mean(self):
+        """
+        Mean UV per cell, NaN where nothing was recorded.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.counts > 0, self.sums / np.maximum(self.counts, 1), np.nan)
+
+    def maximum(self):
+        """
+        Highest UV per cell, NaN where nothing was recorded.
+        """
+        return np.where(self.counts > 0, self.maxima, np.nan)
+
+    def snapshot(self):
+        """
+        A copy with read-only arrays, safe to share while this grid keeps growing.
+        """
+        grid = UVGrid(self.cell_size)
+        grid.origin, grid.rows = self.origin, self.rows
+        for name in ('sums', 'counts', 'maxima'):
+            values = getattr(self, name).copy()
+            values.flags.writeable = False
+            setattr(grid, name, values)
+        return grid
+
+    def x0(self):
+        """
+        X coordinate of the centre of the first column of cells.
+        """
+        return (self.origin[0] + 0.5) * self.cell_size
+
+    def y0(self):
+        """
+        Y coordinate of the centre of the first row of cells.
+        """
+        return (self.origin[1] + 0.5) * self.cell_size
@@ -0,0 +1,220 @@
+import os
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import streamlit as st
+from movement_data import MEASUREMENT_COLUMNS
+from movement_db import MOVEMENT_COLUMNS, connect, day_bounds, ingest_movements_csv, insert_movements, movements_revision, query_movements
+from plant_movement_viz import arrived_out_of_order, calculate_positions, continue_positions, last_positions, merge_positions
+from light_map import UVGrid
+
+# Seconds between refreshes of the live Wayfinder and Crew Stats
+LIVE_REFRESH_SECONDS = 5
+
+# Local port accepting POSTed movement rows (0 leaves the endpoint off)
+TELEMETRY_PORT = int(os.getenv("SUNRUN_TELEMETRY_PORT", "0"))
+
+# Days whose calculated paths (and light maps) are kept for incremental refreshes
+MAX_LIVE_DAYS = 8
+
+@st.cache_resource(show_spinner=False)
+def _ingest_lock():
+    """
+    Serializes CSV ingests, so concurrent refreshes don't parse the same bytes twice.
+    """
+    return threading.Lock()
+
+def refresh_movements():
+    """
+    Pull rows appended to the CSV drop into the database.
+
+    Returns:
+        The movements revision afterwards (see movements_revision)
+    """
+    with closing(connect()) as conn:
+        with _ingest_lock():
+            ingest_movements_csv(conn)
+        return movements_revision(conn)
+
+class _DayPositions:
+    """
+    A day's calculated paths, and the revision they're up to date with.
+
+    Once the day's light map has been asked for, it's kept here too and new rows
+    are binned into it as they're added to the paths.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.positions = None
+        self.revision = 0
+        self.light_map = None
+        self.light_map_snapshot = None
+
+    def bin_positions(self, positions_df):
+        """
+        Add positioned rows to the light map, if one is kept.
+        """
+        if self.light_map is not None and not positions_df.empty:
+            self.light_map.add(positions_df['X'], positions_df['Y'], positions_df['UV Levels (%)'])
+            self.light_map_snapshot = self.light_map.snapshot()
+
+    def refresh(self, day, revision):
+        """
+        Bring the paths and light map up to date with the given revision. Call with the lock held.
+        """
+        if self.positions is not None and revision <= self.revision:
+            return
+
+        start, end = day_bounds(day)
+        with closing(connect()) as conn:
+            new_rows = query_movements(conn, start, end, after_id=self.revision, up_to_id=revision)
+            if self.positions is not None and arrived_out_of_order(self.positions, new_rows):
+                self.positions = None
+                new_rows = query_movements(conn, start, end, up_to_id=revision)
+
+        if self.positions is None:
+            self.positions = calculate_positions(new_rows)
+            if self.light_map is not None:
+                self.light_map = UVGrid()
+                self.light_map_snapshot = self.light_map.snapshot()
+                self.bin_positions(self.positions)
+        elif not new_rows.empty:
+            new_positions = continue_positions(new_rows, last_positions(self.positions))
+            self.positions = merge_positions(self.positions, new_positions)
+            self.bin_positions(new_positions)
+        self.revision = revision
+
+@st.cache_resource(show_spinner=False)
+def _day_positions_store():
+    """
+    Calculated paths for recently viewed days, shared across sessions.
+    """
+    return OrderedDict(), threading.Lock()
+
+def _day_state(day):
+    """
+    A day's _DayPositions, marking it as the most recently used.
+    """
+    store, store_lock = _day_positions_store()
+    with store_lock:
+        state = store.pop(day, None) or _DayPositions()
+        store[day] = state
+        while len(store) > MAX_LIVE_DAYS:
+            store.popitem(last=False)
+    return state
+
+def day_positions(day, revision):
+    """
+    Movement rows for one day with X and Y, up to date with the given revision.
+
+    Only rows stored since the day was last refreshed are read, and their paths
+    continue from where each plant had got to. Rows arriving out of order make
+    the day's paths be recalculated from scratch instead.
+
+    The same DataFrame is shared by every caller, so it must be treated as read-only.
+
+    Args:
+        day: The date to load
+        revision: Current movements revision (see movements_revision)
+
+    Returns:
+        DataFrame with the movements.csv columns plus X and Y
+    """
+    state = _day_state(day)
+    with state.lock:
+        state.refresh(day, revision)
+        return state.positions
+
+def day_light_map(day, revision):
+    """
+    UV grid for one voyage day, up to date with the given revision.
+
+    Built from the day's paths (see day_positions) the first time it's asked
+    for; after that only newly added rows are binned, and it's rebuilt along
+    with the paths if rows arrive out of order.
+
+    Args:
+        day: The date to map
+        revision: Current movements revision (see movements_revision)
+
+    Returns:
+        Read-only snapshot of the day's UVGrid, shared by every caller until
+        new rows arrive
+    """
+    state = _day_state(day)
+    with state.lock:
+        state.refresh(day, revision)
+        if state.light_map is None:
+            state.light_map = UVGrid()
+            state.light_map_snapshot = state.light_map.snapshot()
+            state.bin_positions(state.positions)
+        return state.light_map_snapshot
+
+class _TelemetryHandler(BaseHTTPRequestHandler):
+    """
+    POST /movements with a JSON list of rows (movements.csv labels or the
+    short names name/timestamp/rotation/distance/uv).
+    """
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/movements':
+            self._reply(404, {'error': 'not found'})
+            return
+
+        import pandas as pd
+        try:
+            rows = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            movements_df = pd.DataFrame(rows if isinstance(rows, list) else [rows]).rename(columns=MOVEMENT_COLUMNS)
+            missing = [label for label in MOVEMENT_COLUMNS.values() if label not in movements_df.columns]
+            if missing:
+                raise ValueError(f"missing columns: {', '.join(missing)}")
+            if movements_df['Name'].isna().any():
+                raise ValueError("name must not be null")
+            movements_df['Timestamp'] = pd.to_datetime(movements_df['Timestamp'])
+            if movements_df['Timestamp'].isna().any():
+                raise ValueError("timestamp must not be null")
+            for column in MEASUREMENT_COLUMNS:
+                movements_df[column] = pd.to_numeric(movements_df[column], errors='raise')
+        except (ValueError, TypeError) as e:
+            self._reply(400, {'error': str(e)})
+            return
+
+        try:
+            with closing(connect()) as conn, conn:
+                inserted = insert_movements(conn, movements_df)
+        except sqlite3.Error as e:
+            self._reply(500, {'error': str(e)})
+            return
+        self._reply(200, {'inserted': inserted})
+
+    def log_message(self, format, *args):
+        pass  # Keep robot traffic out of the Streamlit log
+
+@st.cache_resource(show_spinner=False)
+def start_telemetry_server(port=TELEMETRY_PORT):
+    """
+    Start the local ingest endpoint once per process, if a port is configured.
+
+    Returns:
+        The running server, or None when the endpoint is off or couldn't start
+    """
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), _TelemetryHandler)
+    except OSError as e:
+        # e.g. the port is taken by another app; CSV drops still work without it
+        st.warning(f"Couldn't start the telemetry endpoint on port {port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, daemon=True, name="telemetry-ingest").start()
+    return server
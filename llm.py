@@ -0,0 +1,322 @@
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from datetime import date
+import streamlit as st
+from dotenv import load_dotenv, find_dotenv
+from profiler import section
+
+# Models used by the dashboard
+PROFILE_MODEL = 'gemini-1.5-flash'
+CREW_LOG_MODEL = 'gemini-1.5-pro'
+
+# Request rate allowed per model across all sessions, and how many may go out back to back
+REQUESTS_PER_MINUTE = {PROFILE_MODEL: 60, CREW_LOG_MODEL: 30}
+RATE_LIMIT_BURST = 5
+
+# Errors worth retrying (google.api_core.exceptions): rate limiting, timeouts and server-side hiccups
+TRANSIENT_ERRORS = (
+    'ResourceExhausted',
+    'TooManyRequests',
+    'ServiceUnavailable',
+    'DeadlineExceeded',
+    'InternalServerError',
+)
+MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+
+# "gemini" calls the API; "local" answers with deterministic stand-in text, offline
+BACKEND = os.getenv("SUNRUN_LLM_BACKEND", "gemini")
+
+# Seconds a single request may take, and the most tokens it may write
+REQUEST_TIMEOUT = float(os.getenv("SUNRUN_LLM_TIMEOUT", "60"))
+MAX_OUTPUT_TOKENS = int(os.getenv("SUNRUN_LLM_MAX_OUTPUT_TOKENS", "1024"))
+
+# Requests and tokens allowed per calendar day, across the whole process (0 for no limit)
+DAILY_REQUEST_BUDGET = int(os.getenv("SUNRUN_LLM_DAILY_REQUESTS", "1000"))
+DAILY_TOKEN_BUDGET = int(os.getenv("SUNRUN_LLM_DAILY_TOKENS", "0"))
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is anything slower
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+
+# Vocabulary for the local backend
+LOCAL_WORDS = [
+    "sunlit", "leafy", "drifting", "patient", "curious", "mossy", "glimmering", "rooted",
+    "wandering", "verdant", "quiet", "bright", "tendril", "petal", "voyage", "compass",
+    "lantern", "meadow", "horizon", "spore", "canopy", "dewdrop", "whisper", "orbit",
+]
+
+class BudgetExceeded(RuntimeError):
+    """
+    Raised instead of making a request once the day's request or token budget is spent.
+    """
+
+@st.cache_resource(show_spinner=False)
+def _configure():
+    """
+    Load the API key and configure the SDK once per process.
+
+    The SDK is only imported here, when the first real request is about to be made.
+    """
+    import google.generativeai as genai
+    load_dotenv(dotenv_path=find_dotenv())
+    genai.configure(api_key=os.getenv("KEY"))
+    return genai
+
+class _Usage:
+    """
+    Per-call-site latency histograms and token counts, plus today's budget spend.
+
+    Process-wide and thread-safe.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites = {}
+        self._day = date.today()
+        self._day_requests = 0
+        self._day_tokens = 0
+
+    def _roll_day(self):
+        if date.today() != self._day:
+            self._day, self._day_requests, self._day_tokens = date.today(), 0, 0
+
+    def reserve(self):
+        """
+        Count a request against today's budget, or raise BudgetExceeded.
+        """
+        with self._lock:
+            self._roll_day()
+            if DAILY_REQUEST_BUDGET and self._day_requests >= DAILY_REQUEST_BUDGET:
+                raise BudgetExceeded(f"Daily budget of {DAILY_REQUEST_BUDGET} requests spent")
+            if DAILY_TOKEN_BUDGET and self._day_tokens >= DAILY_TOKEN_BUDGET:
+                raise BudgetExceeded(f"Daily budget of {DAILY_TOKEN_BUDGET} tokens spent")
+            self._day_requests += 1
+
+    def record(self, site, seconds, prompt_tokens=0, output_tokens=0, failed=False):
+        """
+        Add one finished call to its site's totals.
+        """
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+        with self._lock:
+            self._roll_day()
+            stats = self._sites.setdefault(site, {
+                'calls': 0, 'errors': 0, 'seconds': 0.0,
+                'prompt_tokens': 0, 'output_tokens': 0,
+                'latency_histogram': [0] * (len(LATENCY_BUCKETS) + 1),
+            })
+            stats['calls'] += 1
+            stats['errors'] += failed
+            stats['seconds'] += seconds
+            stats['prompt_tokens'] += prompt_tokens
+            stats['output_tokens'] += output_tokens
+            stats['latency_histogram'][bucket] += 1
+            self._day_tokens += prompt_tokens + output_tokens
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'day': self._day.isoformat(),
+                'requests_today': self._day_requests,
+                'tokens_today': self._day_tokens,
+                'latency_buckets': list(LATENCY_BUCKETS),
+                'sites': {site: {**stats, 'latency_histogram': list(stats['latency_histogram'])}
+                          for site, stats in self._sites.items()},
+            }
+
+_usage = _Usage()
+
+def llm_usage():
+    """
+    Calls, errors, latency histogram and token counts per call site, and today's budget spend.
+    """
+    return _usage.snapshot()
+
+def _token_counts(response):
+    """
+    (prompt, output) token counts reported with a response or its last streamed chunk.
+    """
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return 0, 0
+    return getattr(usage, 'prompt_token_count', 0) or 0, getattr(usage, 'candidates_token_count', 0) or 0
+
+class _LocalUsage:
+    def __init__(self, prompt_tokens, output_tokens):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+
+class _LocalResponse:
+    """
+    Stand-in for a Gemini response or streamed chunk.
+    """
+    def __init__(self, text, prompt_tokens=0, output_tokens=0):
+        self.text = text
+        self.usage_metadata = _LocalUsage(prompt_tokens, output_tokens)
+
+class _LocalBackend:
+    """
+    Deterministic offline model: the same prompt always gets the same answer.
+
+    Structured (JSON schema) requests get an object with every required field filled in.
+    """
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def _phrase(self, seed, words):
+        digest = hashlib.sha256(seed.encode()).digest()
+        return " ".join(LOCAL_WORDS[b % len(LOCAL_WORDS)] for b in digest[:words]).capitalize()
+
+    def generate_content(self, prompt, generation_config=None, stream=False, request_options=None):
+        schema = (generation_config or {}).get('response_schema')
+        if schema:
+            text = json.dumps({field: self._phrase(f"{prompt}:{field}", 4)
+                               for field in schema.get('required', schema.get('properties', {}))})
+        else:
+            text = f"{self._phrase(prompt, 16)}."
+
+        prompt_tokens, output_tokens = len(prompt.split()), len(text.split())
+        if not stream:
+            return _LocalResponse(text, prompt_tokens, output_tokens)
+
+        # A few chunks, with the usage on the last one as the API does
+        words = text.split(" ")
+        chunks = [" ".join(words[i:i + 4]) + (" " if i + 4 < len(words) else "") for i in range(0, len(words), 4)]
+        return iter([_LocalResponse(chunk) for chunk in chunks[:-1]] +
+                    [_LocalResponse(chunks[-1], prompt_tokens, output_tokens)])
+
+class Model:
+    """
+    A model behind the shared timeout, token cap, daily budget and usage accounting.
+
+    generate_content takes the same arguments as the SDK's and returns objects with
+    the same .text, so callers don't need to know which backend is in use.
+    """
+    def __init__(self, model_name, site, backend):
+        self.model_name = model_name
+        self.site = site
+        self._backend = backend
+
+    def generate_content(self, prompt, generation_config=None, stream=False, site=None, timeout=REQUEST_TIMEOUT):
+        """
+        Make a request, accounted to `site` (defaults to the site the model was fetched for).
+
+        Raises:
+            BudgetExceeded: If the day's budget is already spent
+        """
+        site = site or self.site
+        _usage.reserve()
+        config = {'max_output_tokens': MAX_OUTPUT_TOKENS, **(generation_config or {})}
+        start = time.perf_counter()
+        try:
+            response = self._backend.generate_content(prompt, generation_config=config, stream=stream,
+                                                      request_options={'timeout': timeout})
+        except Exception:
+            _usage.record(site, time.perf_counter() - start, failed=True)
+            raise
+
+        if not stream:
+            _usage.record(site, time.perf_counter() - start, *_token_counts(response))
+            return response
+        return self._stream(response, site, start)
+
+    def _stream(self, chunks, site, start):
+        """
+        Pass chunks through, recording the call once the stream ends.
+        """
+        last, failed = None, True
+        try:
+            for chunk in chunks:
+                last = chunk
+                yield chunk
+            failed = False
+        finally:
+            _usage.record(site, time.perf_counter() - start, *_token_counts(last), failed=failed)
+
+@st.cache_resource(show_spinner=False)
+def get_model(model_name, site=None):
+    """
+    Shared model client, built the first time it's asked for and reused across reruns and sessions.
+
+    Args:
+        model_name: Gemini model name
+        site: Label its calls are accounted under (defaults to the model name)
+    """
+    with section("Model construction"):
+        if BACKEND == "local":
+            backend = _LocalBackend(model_name)
+        else:
+            genai = _configure()
+            backend = genai.GenerativeModel(model_name)
+    return Model(model_name, site or model_name, backend)
+
+class RateLimiter:
+    """
+    Token bucket: allows `burst` calls at once, refilled at `rate` calls per second.
+
+    Thread-safe; acquire() blocks until a token is available.
+    """
+    def __init__(self, rate, burst=RATE_LIMIT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+@st.cache_resource(show_spinner=False)
+def get_rate_limiter(model_name):
+    """
+    Shared limiter for a model, so concurrent sessions draw from the same quota.
+
+    The local backend has no quota, so it's effectively unlimited.
+    """
+    if BACKEND == "local":
+        return RateLimiter(float('inf'), burst=float('inf'))
+    return RateLimiter(REQUESTS_PER_MINUTE.get(model_name, 60) / 60)
+
+def call_with_retries(call, limiter=None, max_attempts=MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY):
+    """
+    Run an API call, retrying transient errors with jittered exponential backoff.
+
+    Args:
+        call: Function making the request
+        limiter: Optional RateLimiter to wait on before each attempt
+        max_attempts: Total attempts before giving up
+        base_delay: Seconds to wait after the first failure; doubles each retry
+
+    Returns:
+        Whatever `call` returns
+
+    Raises:
+        The last transient error if every attempt fails; other errors immediately
+    """
+    if BACKEND == "local":
+        # The stand-in backend has nothing transient to retry, and shouldn't load the Google SDK
+        transient_errors = ()
+    else:
+        from google.api_core import exceptions as api_exceptions
+        transient_errors = tuple(getattr(api_exceptions, name) for name in TRANSIENT_ERRORS)
+
+    for attempt in range(max_attempts):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return call()
+        except transient_errors:
+            if attempt == max_attempts - 1:
+                raise
+            time.sleep(base_delay * 2 ** attempt * random.uniform(1, 1.5))
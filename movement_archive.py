@@ -0,0 +1,255 @@
+import os
+import json
+import shutil
+import threading
+from datetime import date
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import streamlit as st
+from movement_db import MOVEMENT_COLUMNS, TIMESTAMP_FORMAT, day_bounds, movements_revision, query_movements
+from movement_data import MOVEMENT_DTYPES, STORED_DTYPES
+
+ARCHIVE_DIR = "movement_archive"
+
+# Bump when the archive layout or rollup columns change, so the archive is rebuilt
+ARCHIVE_VERSION = 3
+
+# Rows per Parquet row group. Rows are sorted by plant, so each group covers a
+# narrow range of names and reading one plant skips most of a day's file.
+ROW_GROUP_ROWS = 8192
+
+# Datasets in the archive, each partitioned into one directory per day:
+# every movement row, and per-plant totals for each hour and each day
+DATASETS = ('movements', 'hourly', 'daily')
+
+# Read back as these types; the day comes from the partition directory name
+_PARTITIONING = ds.partitioning(pa.schema([('day', pa.string())]), flavor='hive')
+
+def _rollup(positions, keys):
+    """
+    Per-plant totals for each group of rows, in the same terms as plant_stats.
+
+    Rotation is kept as sin/cos sums alongside the heading, so rollups can be
+    combined again (e.g. hours into a week) without a wrap-around at 360°.
+    """
+    rotation_rad = np.radians(positions['Rotation (°)'].to_numpy(dtype=np.float64))
+    rows = pd.DataFrame({
+        **{key: positions[key] for key in keys},
+        'distance': positions['Distance Traveled (in)'].astype(np.float64),
+        'rotation_sin': np.sin(rotation_rad),
+        'rotation_cos': np.cos(rotation_rad),
+        'uv': positions['UV Levels (%)'].astype(np.float64),
+    })
+    totals = rows.groupby(keys, observed=True, sort=True).agg(
+        count=('distance', 'size'),
+        distance_count=('distance', 'count'),
+        uv_count=('uv', 'count'),
+        distance_total=('distance', 'sum'),
+        distance_max=('distance', 'max'),
+        rotation_sin=('rotation_sin', 'sum'),
+        rotation_cos=('rotation_cos', 'sum'),
+        uv_total=('uv', 'sum'),
+        uv_max=('uv', 'max'),
+    ).reset_index()
+    totals['distance_mean'] = totals['distance_total'] / totals['distance_count']
+    totals['heading'] = np.degrees(np.arctan2(totals['rotation_sin'], totals['rotation_cos'])) % 360
+    totals['uv_mean'] = totals['uv_total'] / totals['uv_count']
+    return totals
+
+def _write_partition(archive_dir, dataset, day, df):
+    """
+    Replace one day's file in a dataset. Written then renamed, so readers never see a partial file.
+    """
+    directory = os.path.join(archive_dir, dataset, f"day={day.isoformat()}")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "part-0.parquet")
+
+    # Name is written as plain strings: Parquet still dictionary-encodes it on disk,
+    # and its row group statistics stay usable for filtering by plant
+    table = pa.Table.from_pandas(df.assign(Name=df['Name'].astype(str)), preserve_index=False)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_ROWS,
+                   use_dictionary=['Name'], compression='zstd')
+    os.replace(tmp_path, path)
+
+def archive_day(conn, day, archive_dir=ARCHIVE_DIR, up_to_id=None):
+    """
+    Write one day's movements and its hourly and daily rollups to the archive.
+
+    Args:
+        conn: SQLite connection
+        day: The date to archive
+        archive_dir: Root of the archive
+        up_to_id: Only include rows with an id up to this (see movements_revision)
+    """
+    start, end = day_bounds(day)
+    # Full precision, so the rollups' totals match plant_stats
+    movements_df = query_movements(conn, start, end, up_to_id=up_to_id, dtypes=STORED_DTYPES)
+    if movements_df.empty:
+        for dataset in DATASETS:
+            shutil.rmtree(os.path.join(archive_dir, dataset, f"day={day.isoformat()}"), ignore_errors=True)
+        return
+
+    movements_df = movements_df.sort_values(['Name', 'Timestamp'], kind='stable')
+    _write_partition(archive_dir, 'movements', day, movements_df)
+    _write_partition(archive_dir, 'hourly', day,
+                     _rollup(movements_df.assign(Hour=movements_df['Timestamp'].dt.floor('h')), ['Name', 'Hour']))
+    _write_partition(archive_dir, 'daily', day, _rollup(movements_df, ['Name']))
+
+def _manifest_path(archive_dir):
+    return os.path.join(archive_dir, "manifest.json")
+
+def _load_manifest(archive_dir):
+    """
+    How far the archive has got: the movements revision it's complete up to, and
+    the newest row id archived for each day.
+    """
+    try:
+        with open(_manifest_path(archive_dir), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+    if not manifest or manifest.get('version') != ARCHIVE_VERSION:
+        # Missing, unreadable or from an older layout: start again
+        for dataset in DATASETS:
+            shutil.rmtree(os.path.join(archive_dir, dataset), ignore_errors=True)
+        manifest = {'version': ARCHIVE_VERSION, 'revision': 0, 'days': {}}
+    return manifest
+
+def _save_manifest(archive_dir, manifest):
+    os.makedirs(archive_dir, exist_ok=True)
+    path = _manifest_path(archive_dir)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+@st.cache_resource(show_spinner=False)
+def _archive_lock():
+    """
+    Serializes compactions, so two sessions never rewrite the same day at once.
+    """
+    return threading.Lock()
+
+def compact_movements(conn, before_day=None, archive_dir=ARCHIVE_DIR):
+    """
+    Bring the archive up to date with the database, one whole day at a time.
+
+    Only days with rows stored since the last compaction are rewritten, found
+    through the rows' ids rather than by scanning every day. Days from
+    before_day onwards are still being recorded and are left for later.
+
+    Args:
+        conn: SQLite connection
+        before_day: First day not to archive yet (defaults to today)
+        archive_dir: Root of the archive
+
+    Returns:
+        List of the days written
+    """
+    before_day = before_day or date.today()
+    with _archive_lock():
+        manifest = _load_manifest(archive_dir)
+        revision = movements_revision(conn)
+        if revision <= manifest['revision']:
+            return []
+
+        changed = conn.execute("""
+            SELECT substr(timestamp, 1, 10) AS day, MAX(id) FROM movements
+            WHERE id > ? AND id <= ?
+            GROUP BY day
+        """, (manifest['revision'], revision)).fetchall()
+
+        written = []
+        for day_text, max_id in changed:
+            day = date.fromisoformat(day_text)
+            if day >= before_day or max_id <= manifest['days'].get(day_text, 0):
+                continue
+            archive_day(conn, day, archive_dir, up_to_id=revision)
+            manifest['days'][day_text] = max_id
+            written.append(day)
+
+        # Rows of days not archived yet must be looked at again next time, so the
+        # archive is only complete up to just before the first of them
+        first_pending = conn.execute(
+            "SELECT MIN(id) FROM movements WHERE id > ? AND id <= ? AND timestamp >= ?",
+            (manifest['revision'], revision, day_bounds(before_day)[0].strftime(TIMESTAMP_FORMAT))
+        ).fetchone()[0]
+        manifest['revision'] = revision if first_pending is None else first_pending - 1
+        _save_manifest(archive_dir, manifest)
+        return written
+
+def _read(dataset, start_day, end_day, names, columns, archive_dir):
+    """
+    Read a dataset, opening only the days asked for and skipping row groups of other plants.
+    """
+    path = os.path.join(archive_dir, dataset)
+    if not os.path.isdir(path):
+        return None
+    data = ds.dataset(path, format='parquet', partitioning=_PARTITIONING)
+
+    conditions = []
+    if start_day is not None:
+        conditions.append(ds.field('day') >= start_day.isoformat())
+    if end_day is not None:
+        conditions.append(ds.field('day') <= end_day.isoformat())
+    if names is not None:
+        conditions.append(ds.field('Name').isin(list(names)))
+    condition = None
+    for clause in conditions:
+        condition = clause if condition is None else condition & clause
+
+    table = data.to_table(columns=columns, filter=condition)
+    if 'Name' in table.column_names:
+        # Stored as strings so row groups can be filtered; hand back a category like query_movements()
+        index = table.column_names.index('Name')
+        table = table.set_column(index, 'Name', pc.dictionary_encode(table['Name']))
+    return table.to_pandas()
+
+def read_archived_movements(start_day=None, end_day=None, names=None, columns=None, archive_dir=ARCHIVE_DIR):
+    """
+    Movement rows from the archive.
+
+    Only the requested days' files are opened and only the requested columns
+    decoded; with names given, row groups holding other plants are skipped.
+
+    Args:
+        start_day: First day to include (date), or None for no bound
+        end_day: Last day to include (date), or None for no bound
+        names: Plant names to include, or None for the whole crew
+        columns: Columns to read (movements.csv labels, plus 'day'), or None for all of them
+
+    Returns:
+        DataFrame with the same dtypes as query_movements(), or None if nothing is archived
+    """
+    movements_df = _read('movements', start_day, end_day, names,
+                         columns if columns is not None else list(MOVEMENT_COLUMNS.values()), archive_dir)
+    if movements_df is None:
+        return None
+    return movements_df.astype({column: dtype for column, dtype in MOVEMENT_DTYPES.items()
+                                if column in movements_df.columns})
+
+def read_rollups(period='daily', start_day=None, end_day=None, names=None, columns=None, archive_dir=ARCHIVE_DIR):
+    """
+    Precomputed per-plant totals, for views spanning many days.
+
+    Each row covers one plant for one hour ('hourly', keyed by Name and Hour) or
+    one day ('daily', keyed by Name and day), with count, distance_total/mean/max,
+    heading (circular mean of rotation), uv_mean/uv_max, and the sums and
+    non-null counts behind them (uv_total, rotation_sin, rotation_cos,
+    distance_count, uv_count) for combining rows further.
+
+    Args:
+        period: 'hourly' or 'daily'
+        start_day, end_day, names, columns: As for read_archived_movements
+
+    Returns:
+        DataFrame, or None if nothing is archived
+    """
+    if period not in ('hourly', 'daily'):
+        raise ValueError(f"Unknown rollup period: {period}")
+    return _read(period, start_day, end_day, names, columns, archive_dir)
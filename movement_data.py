@@ -0,0 +1,138 @@
+import os
+import hashlib
+from io import BytesIO
+
+# Default location of the robots' movement log
+MOVEMENTS_CSV = "movements.csv"
+
+MEASUREMENT_COLUMNS = ['Rotation (°)', 'Distance Traveled (in)', 'UV Levels (%)']
+
+# Explicit dtypes so pandas doesn't have to infer them on every parse
+MOVEMENT_DTYPES = {
+    'Name': 'category',
+    **{column: 'float32' for column in MEASUREMENT_COLUMNS},
+}
+
+# The same at the precision SQLite stores, for rows being written or summed up
+STORED_DTYPES = {
+    'Name': 'category',
+    **{column: 'float64' for column in MEASUREMENT_COLUMNS},
+}
+
+# Leading bytes of a file hashed to recognise it on the next read
+HEAD_BYTES = 4096
+
+class MovementTail:
+    """
+    Follows an append-only movements CSV, parsing only the rows added since the last read.
+
+    Remembers how far into the file it has read, how many rows that was and which
+    file it was (device, inode and a hash of its first bytes). If the file shrank,
+    was replaced or was rewritten in place, the next read starts over from the top.
+    """
+    def __init__(self, path=MOVEMENTS_CSV, byte_offset=0, row_count=0, device=None, inode=None, head=None):
+        self.path = path
+        self.byte_offset = byte_offset
+        self.row_count = row_count
+        self.device = device
+        self.inode = inode
+        self.head = head
+
+    def state(self):
+        """
+        Where the tail has got to, as keyword arguments for a new MovementTail.
+        """
+        return {'byte_offset': self.byte_offset, 'row_count': self.row_count,
+                'device': self.device, 'inode': self.inode, 'head': self.head}
+
+    def _reset(self):
+        self.byte_offset, self.row_count, self.head = 0, 0, None
+
+    def _same_file(self, f, stat):
+        """
+        Whether the open file is still the one the stored offset refers to.
+        """
+        if stat.st_size < self.byte_offset:
+            return False  # Truncated
+        if self.device is not None and (stat.st_dev, stat.st_ino) != (self.device, self.inode):
+            return False  # Rotated: a new file now lives at the path
+        if self.head is not None:
+            # Bytes already read never change in an append-only file
+            f.seek(0)
+            if hashlib.sha256(f.read(min(self.byte_offset, HEAD_BYTES))).hexdigest() != self.head:
+                return False  # Rewritten in place
+        return True
+
+    def read_appended(self):
+        """
+        Parse the complete lines added since the last read.
+
+        A partially written last line is left for the next read; rows that can't be
+        parsed are skipped (see parse_movements) and never read again.
+
+        Returns:
+            (rows, reloaded): DataFrame of the new rows (None if there are none) and
+            whether the file was read from the start because it was truncated or
+            replaced, in which case rows holds everything in it
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return None, False
+
+        with f:
+            stat = os.fstat(f.fileno())
+            reloaded = self.byte_offset > 0 and not self._same_file(f, stat)
+            if reloaded:
+                self._reset()
+            self.device, self.inode = stat.st_dev, stat.st_ino
+            if stat.st_size == self.byte_offset:
+                return None, reloaded
+
+            f.seek(0)
+            header = f.readline()
+            if not header.endswith(b'\n'):
+                return None, reloaded  # Header still being written
+            offset = self.byte_offset or f.tell()
+            f.seek(offset)
+            chunk = f.read()
+            complete = chunk[:chunk.rfind(b'\n') + 1]
+            new_offset = offset + len(complete)
+
+            # The head hash covers the first bytes read, so refresh it until they're all in
+            if new_offset > self.byte_offset and self.byte_offset < HEAD_BYTES:
+                f.seek(0)
+                self.head = hashlib.sha256(f.read(min(new_offset, HEAD_BYTES))).hexdigest()
+        self.byte_offset = new_offset
+
+        if not complete:
+            return None, reloaded
+
+        rows = parse_movements(header + complete)
+        self.row_count += len(rows)
+        return rows, reloaded
+
+def parse_movements(data):
+    """
+    Parse movements CSV bytes (header included), skipping rows that can't be read.
+
+    Lines with too many fields, rows without a name or a valid timestamp and rows
+    with a measurement that isn't a number are dropped, so one bad line can't stop
+    the rest from being stored. Blank measurements are kept as missing readings.
+
+    Returns:
+        DataFrame typed as STORED_DTYPES, with Timestamp as datetimes
+    """
+    import pandas as pd
+    # Read as text first, so values that don't parse can be told apart from blanks
+    raw = pd.read_csv(BytesIO(data), dtype=str, on_bad_lines='skip')
+    missing = [column for column in ['Name', 'Timestamp', *MEASUREMENT_COLUMNS] if column not in raw.columns]
+    if missing:
+        raise ValueError(f"Movements CSV is missing columns: {', '.join(missing)}")
+
+    rows = raw.assign(Timestamp=pd.to_datetime(raw['Timestamp'], errors='coerce'))
+    valid = rows['Name'].notna() & rows['Timestamp'].notna()
+    for column in MEASUREMENT_COLUMNS:
+        rows[column] = pd.to_numeric(raw[column], errors='coerce')
+        valid &= rows[column].notna() | raw[column].isna()
+    return rows[valid].reset_index(drop=True).astype(STORED_DTYPES)
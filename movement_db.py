@@ -0,0 +1,448 @@
+import os
+import uuid
+import sqlite3
+import streamlit as st
+from datetime import datetime, timedelta, time as dt_time
+from crew_log_store import init_crew_log_table
+from movement_data import MOVEMENTS_CSV, MOVEMENT_DTYPES, STORED_DTYPES, MovementTail
+from profiler import ProfiledConnection
+
+DB_PATH = "plant_db.db"
+
+# pandas and numpy are imported inside the functions that need them, so opening a
+# connection (e.g. to draw the roster) doesn't pay for loading them
+
+# Text format used for timestamps in SQLite, so lexical order matches time order
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# SQLite column -> movements.csv column
+MOVEMENT_COLUMNS = {
+    'name': 'Name',
+    'timestamp': 'Timestamp',
+    'rotation': 'Rotation (°)',
+    'distance': 'Distance Traveled (in)',
+    'uv': 'UV Levels (%)',
+}
+
+def connect(db_path=DB_PATH):
+    """
+    Open a connection to the plant database with the movement tables in place.
+
+    Callers close it when they're done, e.g. with contextlib.closing().
+    """
+    _init_database(db_path)
+    # Queries are timed by the rerun profiler when it's enabled
+    return sqlite3.connect(db_path, check_same_thread=False, factory=ProfiledConnection)
+
+@st.cache_resource(show_spinner=False)
+def _init_database(db_path):
+    """
+    Create or migrate the movement and crew log tables once per process, rather than on every connection.
+
+    Returns:
+        The database's id (see database_id)
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        init_movement_tables(conn)
+        init_crew_log_table(conn)
+        return conn.execute("SELECT uid FROM database_info").fetchone()[0]
+    finally:
+        conn.close()
+
+def database_id(db_path=DB_PATH):
+    """
+    Random id given to the database when it was created.
+
+    Revisions restart when the database is recreated, so caches that outlive the
+    process (e.g. on disk) key on this as well.
+    """
+    return _init_database(db_path)
+
+def init_movement_tables(conn):
+    """
+    Create the movements table, its indexes and the CSV ingest bookkeeping table.
+    """
+    conn.executescript("""
+        -- Identifies this database, as opposed to an earlier one at the same path
+        CREATE TABLE IF NOT EXISTS database_info (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            uid TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS movements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            rotation REAL,
+            distance REAL,
+            uv REAL
+        );
+
+        -- One row per plant per reading; also makes re-ingesting a file a no-op
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_movements_name_timestamp
+            ON movements (name, timestamp);
+
+        -- Time-range queries across the whole crew
+        CREATE INDEX IF NOT EXISTS idx_movements_timestamp
+            ON movements (timestamp);
+
+        -- How far into each CSV drop we've already ingested
+        CREATE TABLE IF NOT EXISTS movement_sources (
+            path TEXT PRIMARY KEY,
+            byte_offset INTEGER NOT NULL,
+            row_count INTEGER NOT NULL,
+            device INTEGER,
+            inode INTEGER,
+            head TEXT
+        );
+
+        -- Running aggregates per plant per day, updated as rows are inserted.
+        -- Rotation is kept as sin/cos sums so its mean wraps correctly at 360°.
+        -- Each measure has its own count of non-null readings to average over.
+        CREATE TABLE IF NOT EXISTS plant_stats (
+            name TEXT NOT NULL,
+            day TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            distance_count INTEGER NOT NULL DEFAULT 0,
+            rotation_count INTEGER NOT NULL DEFAULT 0,
+            uv_count INTEGER NOT NULL DEFAULT 0,
+            distance_sum REAL NOT NULL,
+            distance_max REAL,
+            rotation_sin_sum REAL NOT NULL,
+            rotation_cos_sum REAL NOT NULL,
+            rotation_max REAL,
+            uv_sum REAL NOT NULL,
+            uv_max REAL,
+            PRIMARY KEY (name, day)
+        );
+    """)
+    conn.execute("INSERT OR IGNORE INTO database_info (id, uid) VALUES (1, ?)", (uuid.uuid4().hex,))
+    conn.commit()
+
+    # Add the file identity columns to databases created before them
+    for column, kind in (('device', 'INTEGER'), ('inode', 'INTEGER'), ('head', 'TEXT')):
+        try:
+            conn.execute(f"ALTER TABLE movement_sources ADD COLUMN {column} {kind}")
+            conn.commit()
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+
+    # Add the per-measure counts to databases created before them
+    counts_added = False
+    for column in ('distance_count', 'rotation_count', 'uv_count'):
+        try:
+            conn.execute(f"ALTER TABLE plant_stats ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+            conn.commit()
+            counts_added = True
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+
+    # Databases created before plant_stats (or its counts) existed need a one-off backfill
+    has_stats = conn.execute("SELECT 1 FROM plant_stats LIMIT 1").fetchone()
+    has_movements = conn.execute("SELECT 1 FROM movements LIMIT 1").fetchone()
+    if has_movements and (counts_added or not has_stats):
+        rebuild_plant_stats(conn)
+
+def _stage_movements(conn, movements_df):
+    """
+    Load a batch of movement rows into the staging table, collapsing duplicates.
+    """
+    import numpy as np
+    import pandas as pd
+    timestamps = pd.to_datetime(movements_df['Timestamp']).dt.strftime(TIMESTAMP_FORMAT)
+    rotation = movements_df['Rotation (°)'].to_numpy(dtype=float)
+    rotation_rad = np.radians(rotation)
+    rows = zip(
+        movements_df['Name'].astype(str),
+        timestamps,
+        rotation,
+        movements_df['Distance Traveled (in)'].to_numpy(dtype=float),
+        movements_df['UV Levels (%)'].to_numpy(dtype=float),
+        np.sin(rotation_rad),
+        np.cos(rotation_rad)
+    )
+
+    # Scratch space for a batch of incoming rows; temporary tables belong to one
+    # connection, so it's made here rather than with the shared tables
+    conn.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS movement_staging (
+            name TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            rotation REAL,
+            distance REAL,
+            uv REAL,
+            rotation_sin REAL,
+            rotation_cos REAL,
+            UNIQUE (name, timestamp)
+        )
+    """)
+    conn.execute("DELETE FROM movement_staging")
+    conn.executemany("""
+        INSERT OR IGNORE INTO movement_staging (name, timestamp, rotation, distance, uv, rotation_sin, rotation_cos)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+
+def _fold_staging_into_stats(conn):
+    """
+    Add the staged rows to the per-plant, per-day running aggregates.
+    """
+    conn.execute("""
+        INSERT INTO plant_stats (name, day, count, distance_count, rotation_count, uv_count,
+                                 distance_sum, distance_max, rotation_sin_sum,
+                                 rotation_cos_sum, rotation_max, uv_sum, uv_max)
+        SELECT name, substr(timestamp, 1, 10), COUNT(*), COUNT(distance), COUNT(rotation), COUNT(uv),
+               TOTAL(distance), MAX(distance),
+               TOTAL(rotation_sin), TOTAL(rotation_cos), MAX(rotation), TOTAL(uv), MAX(uv)
+        FROM movement_staging
+        WHERE true
+        GROUP BY name, substr(timestamp, 1, 10)
+        ON CONFLICT(name, day) DO UPDATE SET
+            count = count + excluded.count,
+            distance_count = distance_count + excluded.distance_count,
+            rotation_count = rotation_count + excluded.rotation_count,
+            uv_count = uv_count + excluded.uv_count,
+            distance_sum = distance_sum + excluded.distance_sum,
+            -- Multi-argument MAX() is NULL if any argument is, so neither side may be NULL
+            distance_max = MAX(COALESCE(distance_max, excluded.distance_max), COALESCE(excluded.distance_max, distance_max)),
+            rotation_sin_sum = rotation_sin_sum + excluded.rotation_sin_sum,
+            rotation_cos_sum = rotation_cos_sum + excluded.rotation_cos_sum,
+            rotation_max = MAX(COALESCE(rotation_max, excluded.rotation_max), COALESCE(excluded.rotation_max, rotation_max)),
+            uv_sum = uv_sum + excluded.uv_sum,
+            uv_max = MAX(COALESCE(uv_max, excluded.uv_max), COALESCE(excluded.uv_max, uv_max))
+    """)
+
+def insert_movements(conn, movements_df):
+    """
+    Insert movement rows and fold them into plant_stats.
+
+    Any (name, timestamp) pair that's already stored is skipped, so only genuinely
+    new rows are counted in the running aggregates.
+
+    Args:
+        conn: SQLite connection
+        movements_df: DataFrame with the movements.csv columns
+
+    Returns:
+        Number of rows actually inserted
+    """
+    if movements_df.empty:
+        return 0
+
+    _stage_movements(conn, movements_df)
+
+    # Drop rows we've already seen, so what's left is exactly the new data
+    conn.execute("""
+        DELETE FROM movement_staging
+        WHERE EXISTS (
+            SELECT 1 FROM movements m
+            WHERE m.name = movement_staging.name AND m.timestamp = movement_staging.timestamp
+        )
+    """)
+
+    inserted = conn.execute("""
+        INSERT INTO movements (name, timestamp, rotation, distance, uv)
+        SELECT name, timestamp, rotation, distance, uv FROM movement_staging
+    """).rowcount
+
+    _fold_staging_into_stats(conn)
+    conn.execute("DELETE FROM movement_staging")
+
+    return inserted
+
+def rebuild_plant_stats(conn):
+    """
+    Recompute plant_stats from the full movements table.
+
+    Only needed to backfill an existing database; normal inserts keep it current.
+    """
+    movements_df = query_movements(conn, dtypes=STORED_DTYPES)
+    with conn:
+        conn.execute("DELETE FROM plant_stats")
+        if not movements_df.empty:
+            _stage_movements(conn, movements_df)
+            _fold_staging_into_stats(conn)
+            conn.execute("DELETE FROM movement_staging")
+
+def ingest_movements_csv(conn, path=MOVEMENTS_CSV):
+    """
+    Import rows appended to a CSV drop since the last ingest.
+
+    Where the last ingest got to is kept in movement_sources, so only complete lines
+    past it are parsed (see MovementTail). A truncated or replaced file is re-read
+    from the start; duplicate rows are ignored either way, so running this
+    repeatedly is safe.
+
+    Returns:
+        Number of new rows stored
+    """
+    if not os.path.exists(path):
+        return 0
+
+    source = os.path.abspath(path)
+    state = conn.execute(
+        "SELECT byte_offset, row_count, device, inode, head FROM movement_sources WHERE path = ?", (source,)
+    ).fetchone()
+    tail = MovementTail(path, *state) if state else MovementTail(path)
+    before = tail.state()
+
+    new_rows, _ = tail.read_appended()
+    if tail.state() == before:
+        return 0
+
+    with conn:
+        inserted = insert_movements(conn, new_rows) if new_rows is not None else 0
+        conn.execute("""
+            INSERT INTO movement_sources (path, byte_offset, row_count, device, inode, head)
+            VALUES (:path, :byte_offset, :row_count, :device, :inode, :head)
+            ON CONFLICT(path) DO UPDATE SET
+                byte_offset = excluded.byte_offset, row_count = excluded.row_count,
+                device = excluded.device, inode = excluded.inode, head = excluded.head
+        """, {'path': source, **tail.state()})
+
+    return inserted
+
+def _time_range_clause(start, end, names):
+    """
+    Build the WHERE clause shared by the movement queries.
+    """
+    conditions, params = [], []
+    if start is not None:
+        conditions.append("timestamp >= ?")
+        params.append(start.strftime(TIMESTAMP_FORMAT))
+    if end is not None:
+        conditions.append("timestamp < ?")
+        params.append(end.strftime(TIMESTAMP_FORMAT))
+    if names is not None:
+        conditions.append(f"name IN ({', '.join('?' for _ in names)})")
+        params.extend(names)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+def query_movements(conn, start=None, end=None, names=None, after_id=None, up_to_id=None, dtypes=MOVEMENT_DTYPES):
+    """
+    Fetch movement rows in [start, end) for the given plants, oldest first.
+
+    Args:
+        conn: SQLite connection
+        start: Inclusive lower bound (datetime), or None for no bound
+        end: Exclusive upper bound (datetime), or None for no bound
+        names: Plant names to include, or None for the whole crew
+        after_id: Only rows inserted after this revision (see movements_revision), or None
+        up_to_id: Only rows inserted up to and including this revision, or None
+        dtypes: Column types; STORED_DTYPES keeps the measurements' full precision
+
+    Returns:
+        DataFrame with the movements.csv columns
+    """
+    import pandas as pd
+    where, params = _time_range_clause(start, end, names)
+    for bound, condition in ((after_id, "id > ?"), (up_to_id, "id <= ?")):
+        if bound is not None:
+            where = f"{where} AND {condition}" if where else f"WHERE {condition}"
+            params.append(bound)
+    columns = ', '.join(f'{column} AS "{label}"' for column, label in MOVEMENT_COLUMNS.items())
+    movements_df = pd.read_sql_query(
+        f"SELECT {columns} FROM movements {where} ORDER BY timestamp, name",
+        conn,
+        params=params,
+        parse_dates={'Timestamp': {'format': TIMESTAMP_FORMAT}}
+    )
+    return movements_df.astype(dtypes)
+
+def plant_stats(conn, start_day=None, end_day=None, names=None):
+    """
+    Per-plant movement statistics over whole days, read from the running aggregates.
+
+    Cost depends on the number of plants and days, not on how many rows were recorded.
+
+    Args:
+        conn: SQLite connection
+        start_day: First day to include (date), or None for no bound
+        end_day: Last day to include (date), or None for no bound
+        names: Plant names to include, or None for the whole crew
+
+    Returns:
+        DataFrame indexed by plant name with count, distance_total and the
+        mean/max of distance, rotation (circular mean) and UV
+    """
+    import numpy as np
+    import pandas as pd
+    conditions, params = [], []
+    if start_day is not None:
+        conditions.append("day >= ?")
+        params.append(start_day.isoformat())
+    if end_day is not None:
+        conditions.append("day <= ?")
+        params.append(end_day.isoformat())
+    if names is not None:
+        conditions.append(f"name IN ({', '.join('?' for _ in names)})")
+        params.extend(names)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    totals = pd.read_sql_query(f"""
+        SELECT name AS "Name", SUM(count) AS count,
+               SUM(distance_count) AS distance_count, SUM(uv_count) AS uv_count,
+               SUM(distance_sum) AS distance_total, MAX(distance_max) AS distance_max,
+               SUM(rotation_sin_sum) AS rotation_sin, SUM(rotation_cos_sum) AS rotation_cos,
+               MAX(rotation_max) AS rotation_max,
+               SUM(uv_sum) AS uv_total, MAX(uv_max) AS uv_max
+        FROM plant_stats {where}
+        GROUP BY name
+        ORDER BY name
+    """, conn, params=params, index_col='Name')
+
+    return pd.DataFrame({
+        'count': totals['count'],
+        'distance_total': totals['distance_total'],
+        'distance_mean': totals['distance_total'] / totals['distance_count'],
+        'distance_max': totals['distance_max'],
+        'rotation_mean': np.degrees(np.arctan2(totals['rotation_sin'], totals['rotation_cos'])) % 360,
+        'rotation_max': totals['rotation_max'],
+        'uv_mean': totals['uv_total'] / totals['uv_count'],
+        'uv_max': totals['uv_max'],
+    }, index=totals.index)
+
+def plant_profiles(conn, names, fields=('personality', 'vocation', 'adventure', 'vessel', 'title')):
+    """
+    Profile fields for several plants in a single query.
+
+    Args:
+        conn: SQLite connection
+        names: Plant names to look up
+        fields: Columns of the plants table to return
+
+    Returns:
+        Dict of plant name -> {field: value}; plants not on the roster are left out
+    """
+    names = list(names)
+    if not names:
+        return {}
+    rows = conn.execute(
+        f"SELECT name, {', '.join(fields)} FROM plants WHERE name IN ({', '.join('?' for _ in names)})",
+        names
+    ).fetchall()
+    return {row[0]: dict(zip(fields, row[1:])) for row in rows}
+
+def movement_date_bounds(conn):
+    """
+    First and last day with movement data, or (None, None) if there's none.
+    """
+    first, last = conn.execute("SELECT MIN(timestamp), MAX(timestamp) FROM movements").fetchone()
+    if first is None:
+        return None, None
+    return (datetime.strptime(first, TIMESTAMP_FORMAT).date(),
+            datetime.strptime(last, TIMESTAMP_FORMAT).date())
+
+def movements_revision(conn):
+    """
+    Cheap token that changes whenever movement rows are added, for cache keys.
+    """
+    return conn.execute("SELECT MAX(id) FROM movements").fetchone()[0] or 0
+
+def day_bounds(day):
+    """
+    [start, end) datetimes covering a single calendar day.
+    """
+    start = datetime.combine(day, dt_time.min)
+    return start, start + timedelta(days=1)
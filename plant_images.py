@@ -0,0 +1,159 @@
+import os
+import hashlib
+import threading
+from io import BytesIO
+
+# Where plant photos are stored
+PLANT_IMAGES_DIR = "plants_images"
+
+# Default photo for plants without one (never cleaned up)
+STOCK_IMAGE_PATH = os.path.join(PLANT_IMAGES_DIR, "stock.jpg")
+
+# Uploads are shrunk to fit this box; no view shows a photo anywhere near this big
+MAX_PHOTO_SIZE = (800, 800)
+PHOTO_QUALITY = 85
+
+# Served by Streamlit's static file server (server.enableStaticServing)
+THUMBNAIL_DIR = "static/thumbnails"
+THUMBNAIL_URL_PATH = "app/static/thumbnails"
+
+# Twice the on-screen roster size, so thumbnails stay sharp on high-DPI screens
+THUMBNAIL_SIZE = (160, 160)
+
+def _thumbnail_filename(image_path, stat):
+    key = f"{os.path.abspath(image_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return f"{hashlib.sha1(key.encode()).hexdigest()}.jpg"
+
+def _thumbnail_url_prefix():
+    """
+    Where static files are served, under server.baseUrlPath if the app has one.
+    """
+    import streamlit as st
+    base = (st.get_option("server.baseUrlPath") or "").strip("/")
+    return f"/{base}/{THUMBNAIL_URL_PATH}" if base else f"/{THUMBNAIL_URL_PATH}"
+
+def thumbnail_url(image_path):
+    """
+    URL of a small square thumbnail for a plant photo, creating it on first use.
+
+    Thumbnails are named after the source's path, size and mtime, so replacing a
+    photo produces a new URL and browsers can cache them indefinitely. A photo
+    Pillow can't read (e.g. one stored verbatim before uploads were normalized)
+    gets the stock photo's thumbnail instead.
+
+    Args:
+        image_path: Path to the plant's photo
+
+    Returns:
+        URL path the browser can load the thumbnail from
+    """
+    try:
+        filename = _thumbnail_filename(image_path, os.stat(image_path))
+    except OSError:
+        filename = None
+    if filename is not None:
+        thumbnail_path = os.path.join(THUMBNAIL_DIR, filename)
+        if os.path.exists(thumbnail_path) or _create_thumbnail(image_path, thumbnail_path):
+            return f"{_thumbnail_url_prefix()}/{filename}"
+
+    if os.path.abspath(image_path) == os.path.abspath(STOCK_IMAGE_PATH):
+        raise OSError(f"Can't read the stock photo at {image_path}")
+    return thumbnail_url(STOCK_IMAGE_PATH)
+
+def _create_thumbnail(image_path, thumbnail_path):
+    """
+    Write a photo's thumbnail.
+
+    Returns:
+        False if Pillow can't read the photo
+    """
+    # Pillow is only needed the first time a photo is thumbnailed
+    from PIL import Image, ImageOps
+    try:
+        with Image.open(image_path) as img:
+            thumbnail = ImageOps.fit(ImageOps.exif_transpose(img).convert('RGB'), THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+    except (OSError, Image.DecompressionBombError):
+        return False
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+    # Write then rename, so a concurrent rerun never serves a half-written file;
+    # each thread writes its own temporary file, so sessions can't clobber each other's
+    tmp_path = f"{thumbnail_path}.{threading.get_ident()}.tmp"
+    thumbnail.save(tmp_path, format='JPEG', quality=85, optimize=True)
+    os.replace(tmp_path, thumbnail_path)
+    return True
+
+def save_plant_photo(data, images_dir=PLANT_IMAGES_DIR):
+    """
+    Store an uploaded photo, shrunk to MAX_PHOTO_SIZE and re-encoded as JPEG.
+
+    Photos are named after a hash of the uploaded bytes, so uploading the same
+    photo again (for any plant) reuses the stored file without decoding it.
+
+    Args:
+        data: The uploaded file's bytes
+        images_dir: Directory to store the photo in
+
+    Returns:
+        Path of the stored photo
+
+    Raises:
+        OSError: If the upload isn't an image Pillow can read
+        PIL.Image.DecompressionBombError: If it has too many pixels to decode safely
+    """
+    path = os.path.join(images_dir, f"{hashlib.sha256(data).hexdigest()[:32]}.jpg")
+    if os.path.exists(path):
+        return path
+
+    from PIL import Image, ImageOps
+    with Image.open(BytesIO(data)) as img:
+        # Shrink first: JPEGs are decoded straight at a reduced scale (draft), and
+        # other formats are box-reduced before resampling, so a huge photo is
+        # never converted or rotated at full size
+        img.draft(None, MAX_PHOTO_SIZE)
+        img.thumbnail(MAX_PHOTO_SIZE, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        photo = ImageOps.exif_transpose(img)
+        if photo.mode in ('RGBA', 'LA', 'PA') or 'transparency' in photo.info:
+            # JPEG has no alpha: put transparent areas on white rather than black
+            photo = photo.convert('RGBA')
+            background = Image.new('RGB', photo.size, (255, 255, 255))
+            background.paste(photo, mask=photo.getchannel('A'))
+            photo = background
+        else:
+            photo = photo.convert('RGB')
+
+    os.makedirs(images_dir, exist_ok=True)
+    # Write then rename, so a concurrent rerun never shows a half-written file
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    photo.save(tmp_path, format='JPEG', quality=PHOTO_QUALITY, optimize=True, progressive=True)
+    os.replace(tmp_path, path)
+    return path
+
+def remove_unused_photo(c, image_path, images_dir=PLANT_IMAGES_DIR):
+    """
+    Delete a stored photo and its thumbnail once no plant uses it any more.
+
+    Call after the plant that used it was deleted or given another photo (and
+    the change committed). The stock photo and files outside images_dir are
+    never touched.
+
+    Args:
+        c: Cursor on the plants database
+        image_path: The photo the plant used to have
+        images_dir: Directory photos are stored in
+    """
+    if not image_path or os.path.abspath(image_path) == os.path.abspath(STOCK_IMAGE_PATH):
+        return
+    if os.path.dirname(os.path.abspath(image_path)) != os.path.abspath(images_dir):
+        return
+    if c.execute("SELECT 1 FROM plants WHERE image_path = ? LIMIT 1", (image_path,)).fetchone():
+        return  # Another plant has the same photo
+
+    try:
+        stat = os.stat(image_path)
+    except FileNotFoundError:
+        return
+    for path in (os.path.join(THUMBNAIL_DIR, _thumbnail_filename(image_path, stat)), image_path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # Never thumbnailed, or another session removed it first
@@ -1,15 +1,18 @@
-import os
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from PIL import Image, ImageDraw
 import base64
+import json
 from io import BytesIO
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
-import google.generativeai as genai
-import time
-import sqlite3
+from llm import get_model, get_rate_limiter, call_with_retries, CREW_LOG_MODEL
+from figure_cache import FigureCache, figure_key
+from profiler import section
+from movement_db import connect, plant_profiles
+from crew_log_store import crew_log_fingerprint, load_crew_logs, save_crew_log
+import queue
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
 
 # Define color palette for plants
 COLORS = [
@@ -25,10 +28,157 @@ COLORS = [
     '#FFB4A2',  # Peach
 ]
 
+# Most crew-log requests in flight at once
+CREW_LOG_WORKERS = 4
+
+# Bounds on the Wayfinder animation, however long the day or season was
+MAX_FRAMES = 60
+MAX_FIGURE_BYTES = 3_000_000
+
+# Rough serialized size of one plotted point and of one trace's styling
+POINT_BYTES = 40
+TRACE_BYTES = 600
+
+# A marker stays on its last reading for this many of the plant's usual reporting
+# intervals (and at least one frame) before the plant counts as gone quiet
+STALE_INTERVALS = 2
+
+# Path simplification tolerance, as a fraction of the plot's diagonal
+SIMPLIFY_TOLERANCE = 0.002
+MAX_SIMPLIFY_TOLERANCE = 0.02
+
+# Browser-side Wayfinder: paths are sent once and revealed from a time cursor in JS
+CLIENT_ANIMATION_TEMPLATE = """
+<script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script>
+<div id="wayfinder" style="width: 100%; height: __HEIGHT__px;"></div>
+<div style="display: flex; align-items: center; gap: 12px; font-family: sans-serif; color: #6B705C;">
+    <button id="play" style="min-width: 70px;">Play</button>
+    <input id="cursor" type="range" min="0" max="1000" value="0" style="flex: 1;">
+    <span id="time-label" style="min-width: 150px; text-align: right;"></span>
+</div>
+<script id="wayfinder-data" type="application/json">__PAYLOAD__</script>
+<script>
+    const data = JSON.parse(document.getElementById('wayfinder-data').textContent);
+
+    // Base64 little-endian buffers -> typed arrays (no per-point JSON)
+    function decode(b64, Type) {
+        const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+        return new Type(bytes.buffer);
+    }
+    const plants = data.plants.map(p => ({
+        name: p.name,
+        color: p.color,
+        t: decode(p.t, Float64Array),
+        x: decode(p.x, Float32Array),
+        y: decode(p.y, Float32Array),
+        uv: decode(p.uv, Float32Array)
+    }));
+
+    // Number of samples at or before time t (binary search)
+    function countUpTo(times, t) {
+        let lo = 0, hi = times.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (times[mid] <= t) lo = mid + 1; else hi = mid;
+        }
+        return lo;
+    }
+
+    // Optional UV light map, drawn first so it sits underneath the paths
+    const base = data.light_map ? 1 : 0;
+    const traces = [
+        ...(data.light_map ? [Object.assign({
+            type: 'heatmap', name: 'Light map', hoverongaps: false, zsmooth: false,
+            colorscale: 'YlOrRd', opacity: 0.45, colorbar: {title: 'UV %', x: -0.15},
+            hovertemplate: 'Mean UV: %{z:.1f}%<br>Peak UV: %{customdata:.1f}%<extra></extra>'
+        }, data.light_map)] : []),
+        ...plants.map(p => ({
+            type: 'scattergl', mode: 'lines', name: p.name, showlegend: false, hoverinfo: 'skip',
+            x: [], y: [], line: {color: p.color, width: 2}, opacity: 0.4
+        })),
+        ...plants.map(p => ({
+            type: 'scattergl', mode: 'markers', name: p.name, x: [], y: [],
+            marker: {size: 14, color: p.color},
+            hovertemplate: '<b>' + p.name + '</b><br>Position: (%{x:.2f}, %{y:.2f})<br>UV Level: %{customdata:.1f}%<extra></extra>'
+        }))
+    ];
+    const layout = {
+        xaxis: {range: data.x_range, title: 'X Position (inches)', gridcolor: 'rgba(128,128,128,0.2)', zerolinecolor: 'rgba(128,128,128,0.4)'},
+        yaxis: {range: data.y_range, title: 'Y Position (inches)', scaleanchor: 'x', scaleratio: 1, gridcolor: 'rgba(128,128,128,0.2)', zerolinecolor: 'rgba(128,128,128,0.4)'},
+        title: "Today's Paths", hovermode: 'closest', margin: {l: 80, r: 80, t: 100, b: 60},
+        legend: {yanchor: 'top', y: 0.99, xanchor: 'right', x: 0.99}
+    };
+    const plot = document.getElementById('wayfinder');
+    Plotly.newPlot(plot, traces, layout, {responsive: true});
+
+    const cursor = document.getElementById('cursor');
+    const label = document.getElementById('time-label');
+
+    function render(fraction) {
+        const t = data.t_start + fraction * (data.t_end - data.t_start);
+        const xs = [], ys = [], mx = [], my = [], uv = [];
+        for (const p of plants) {
+            const n = countUpTo(p.t, t);
+            xs.push(p.x.subarray(0, n));
+            ys.push(p.y.subarray(0, n));
+            mx.push(n ? [p.x[n - 1]] : []);
+            my.push(n ? [p.y[n - 1]] : []);
+            uv.push(n ? [p.uv[n - 1]] : []);
+        }
+        const lines = plants.map((_, i) => base + i);
+        const markers = plants.map((_, i) => base + plants.length + i);
+        Plotly.restyle(plot, {x: xs, y: ys}, lines);
+        Plotly.restyle(plot, {x: mx, y: my, customdata: uv}, markers);
+        label.textContent = new Date(t * 1000).toISOString().replace('T', ' ').slice(0, 19);
+    }
+
+    cursor.addEventListener('input', () => render(cursor.value / 1000));
+
+    // Playback advances the cursor every animation frame instead of stepping through Plotly frames
+    let playing = false, last = null;
+    function step(now) {
+        if (!playing) return;
+        if (last !== null) {
+            const next = Math.min(1000, Number(cursor.value) + (now - last) / data.duration_ms * 1000);
+            cursor.value = next;
+            render(next / 1000);
+            if (next >= 1000) { playing = false; document.getElementById('play').textContent = 'Play'; }
+        }
+        last = now;
+        requestAnimationFrame(step);
+    }
+    document.getElementById('play').addEventListener('click', (event) => {
+        playing = !playing;
+        event.target.textContent = playing ? 'Pause' : 'Play';
+        if (playing) {
+            if (Number(cursor.value) >= 1000) cursor.value = 0;
+            last = null;
+            requestAnimationFrame(step);
+        }
+    });
+
+    render(0);
+</script>
+"""
+
+# How long a full client-side playback takes
+CLIENT_PLAYBACK_MS = 20000
+
+# Shown by the client-side renderer for a day without any readings
+CLIENT_EMPTY_HTML = """
+<div style="font-family: sans-serif; color: #6B705C; text-align: center; padding: 48px 0;">
+    No movements were recorded on this day.
+</div>
+"""
+
+# Height of the Wayfinder plot, in pixels
+WAYFINDER_HEIGHT = 600
+
 def create_circular_image(image_path, size=(100, 100)):
     """
     Create a circular image from a rectangular one and return as base64 URL.
     """
+    from PIL import Image, ImageDraw
     # Open and resize image
     img = Image.open(image_path)
     img = img.convert('RGBA')
@@ -51,80 +201,272 @@ def create_circular_image(image_path, size=(100, 100)):
     
     return f'data:image/png;base64,{img_str}'
 
+def _grouped_cumsum(values, starts):
+    """
+    Cumulative sum that restarts at each group start (values must be sorted by group).
+
+    Like groupby().cumsum(), a NaN step comes out as NaN and is skipped by the rows
+    after it, so a missing reading never spreads to later rows or other groups.
+    """
+    missing = np.isnan(values)
+    totals = np.cumsum(np.where(missing, 0.0, values))
+    # Running total just before each group begins, repeated over that group's rows
+    before = np.concatenate(([0.0], totals[starts[1:] - 1]))
+    lengths = np.diff(np.append(starts, len(values)))
+    totals -= np.repeat(before, lengths)
+    totals[missing] = np.nan
+    return totals
+
 def calculate_positions(df):
     """
     Calculate cumulative X and Y positions from rotation angles and distances.
+    
+    Rows come back sorted by plant and time; the input frame isn't modified.
+    """
+    positions = df.sort_values(['Name', 'Timestamp'], kind='stable').reset_index(drop=True)
+    if positions.empty:
+        return positions.assign(X=np.empty(0), Y=np.empty(0))
+    
+    # X and Y components for each movement
+    rotation_rad = np.radians(positions['Rotation (°)'].to_numpy(dtype=np.float64))
+    distance = positions['Distance Traveled (in)'].to_numpy(dtype=np.float64)
+    
+    # First row of each plant's run in the sorted frame
+    plant_codes = pd.factorize(positions['Name'])[0]
+    starts = np.flatnonzero(np.diff(plant_codes, prepend=-1))
+    
+    positions['X'] = _grouped_cumsum(distance * np.cos(rotation_rad), starts)
+    positions['Y'] = _grouped_cumsum(distance * np.sin(rotation_rad), starts)
+    return positions
+
+def last_positions(positions_df):
     """
-    # Convert rotation to radians
-    df['Rotation (rad)'] = np.radians(df['Rotation (°)'])
+    Each plant's latest calculated position, indexed by plant name.
+    """
+    last = positions_df.groupby('Name', observed=True)[['X', 'Y']].last()
+    last.index = last.index.astype(str)
+    return last
+
+def continue_positions(new_rows, start_positions):
+    """
+    Calculate positions for new movement rows, continuing each plant from a known position.
     
-    # Calculate X and Y components for each movement
-    df['X_step'] = df['Distance Traveled (in)'] * np.cos(df['Rotation (rad)'])
-    df['Y_step'] = df['Distance Traveled (in)'] * np.sin(df['Rotation (rad)'])
+    Args:
+        new_rows: Movement rows recorded after start_positions
+        start_positions: DataFrame indexed by plant name with X and Y (from last_positions);
+            plants missing from it start at the origin
     
-    # Calculate cumulative positions for each plant
-    positions = []
-    for plant in df['Name'].unique():
-        plant_data = df[df['Name'] == plant].copy()
-        plant_data['X'] = plant_data['X_step'].cumsum()
-        plant_data['Y'] = plant_data['Y_step'].cumsum()
-        positions.append(plant_data)
+    Returns:
+        DataFrame of just the new rows with X and Y, sorted by plant and time
+    """
+    new_positions = calculate_positions(new_rows)
+    if new_positions.empty or start_positions.empty:
+        return new_positions
     
-    return pd.concat(positions)
+    offsets = start_positions.reindex(new_positions['Name'].astype(str)).fillna(0.0)
+    new_positions['X'] += offsets['X'].to_numpy()
+    new_positions['Y'] += offsets['Y'].to_numpy()
+    return new_positions
+
+def ensure_positions(df):
+    """
+    Rows with X and Y, calculating them only if they aren't there yet.
+    """
+    if 'X' in df.columns and 'Y' in df.columns:
+        return df
+    return calculate_positions(df)
 
-def generate_crew_logs(positions_df, crew_members):
+def arrived_out_of_order(positions_df, new_rows):
+    """
+    Whether any plant's new rows start at or before its latest calculated position,
+    in which case extend_positions can't be used and paths must be recalculated.
     """
-    Generate narrative logs for each crew member using Gemini.
+    if positions_df.empty or new_rows.empty:
+        return False
+    last_times = positions_df.groupby(positions_df['Name'].astype(str))['Timestamp'].max()
+    first_new = new_rows.groupby(new_rows['Name'].astype(str))['Timestamp'].min()
+    return bool((first_new <= last_times.reindex(first_new.index)).any())
+
+def extend_positions(positions_df, new_rows):
     """
-    # Connect to the database to get plant personalities
-    conn = sqlite3.connect("plant_db.db", check_same_thread=False)
-    c = conn.cursor()
+    Extend already calculated paths with newly appended movement rows.
     
-    # Prepare crew data summaries
-    crew_data = {}
-    for member in crew_members:
-        member_data = positions_df[positions_df['Name'] == member]
-        
-        # Simplified movement statistics
-        total_distance = member_data['Distance Traveled (in)'].sum()
-        avg_uv = member_data['UV Levels (%)'].mean()
-        
-        # Get plant personality from database
-        plant_details = c.execute("""
-            SELECT personality, vocation, adventure, vessel, title 
-            FROM plants 
-            WHERE name = ?
-        """, (member,)).fetchone()
-        
-        if plant_details:
-            personality, vocation, adventure, vessel, title = plant_details
-        else:
-            personality = "mysterious"
-            vocation = "wanderer"
-            adventure = "exploring new horizons"
-            vessel = "unknown vessel"
-            title = "Wandering Plant"
-        
-        crew_data[member] = {
+    Each plant's new steps continue from its last known position, so only the new
+    rows are processed. New rows are assumed to be later than the existing ones.
+    
+    Args:
+        positions_df: Output of calculate_positions (or of a previous extend_positions)
+        new_rows: Movement rows recorded since positions_df was calculated
+    
+    Returns:
+        DataFrame with the combined positions, sorted by plant and time
+    """
+    if positions_df.empty:
+        return calculate_positions(new_rows)
+    return merge_positions(positions_df, continue_positions(new_rows, last_positions(positions_df)))
+
+def merge_positions(positions_df, new_positions):
+    """
+    Add newly calculated positions (from continue_positions) to existing ones.
+    
+    Both frames are already sorted by plant and time, and each plant's new rows
+    come after its existing ones, so they're merged rather than re-sorting
+    everything: each new row goes right after the last existing row of its plant.
+    
+    Returns:
+        DataFrame with the combined positions, sorted by plant and time
+    """
+    if new_positions.empty:
+        return positions_df
+    if positions_df.empty:
+        return new_positions
+    
+    old_names = positions_df['Name'].astype(str).to_numpy()
+    insert_at = np.searchsorted(old_names, new_positions['Name'].astype(str).to_numpy(), side='right')
+    old_count, new_count = len(positions_df), len(new_positions)
+    order = np.empty(old_count + new_count, dtype=np.intp)
+    order[np.arange(old_count) + np.searchsorted(insert_at, np.arange(old_count), side='right')] = np.arange(old_count)
+    order[insert_at + np.arange(new_count)] = old_count + np.arange(new_count)
+    
+    combined = pd.concat([positions_df, new_positions], ignore_index=True)
+    if isinstance(positions_df['Name'].dtype, pd.CategoricalDtype):
+        # Concatenating different category sets falls back to object dtype
+        combined['Name'] = combined['Name'].astype('category')
+    return combined.take(order).reset_index(drop=True)
+
+# Stand-in profile for plants that aren't on the roster
+DEFAULT_PROFILE = {
+    'personality': "mysterious",
+    'vocation': "wanderer",
+    'adventure': "exploring new horizons",
+    'vessel': "unknown vessel",
+    'title': "Wandering Plant",
+}
+
+def build_crew_data(conn, crew_stats, crew_members):
+    """
+    Everything the crew-log prompts and the log display use: each member's headline stats and profile.
+    
+    Takes one query for all the profiles, whatever the size of the crew.
+    
+    Args:
+        conn: SQLite connection
+        crew_stats: Per-plant statistics from movement_db.plant_stats, indexed by name
+        crew_members: List of plant names
+    
+    Returns:
+        Dict of member -> {'stats', 'personality', 'vocation', 'adventure', 'vessel', 'title'}
+    """
+    profiles = plant_profiles(conn, crew_members, fields=tuple(DEFAULT_PROFILE))
+    
+    # Simplified movement statistics, formatted for the whole crew at once
+    member_stats = crew_stats.reindex(crew_members)
+    total_distances = member_stats['distance_total'].map("{:.1f}".format)
+    avg_uvs = member_stats['uv_mean'].map("{:.1f}".format)
+    
+    return {
+        member: {
             'stats': {
-                'total_distance': f"{total_distance:.1f}",
-                'avg_uv': f"{avg_uv:.1f}"
+                'total_distance': total_distance,
+                'avg_uv': avg_uv
             },
-            'personality': personality,
-            'vocation': vocation,
-            'adventure': adventure,
-            'vessel': vessel,
-            'title': title
+            **profiles.get(member, DEFAULT_PROFILE)
         }
+        for member, total_distance, avg_uv in zip(crew_members, total_distances, avg_uvs)
+    }
+
+def stream_crew_logs(crew_data, keys=None, max_workers=CREW_LOG_WORKERS):
+    """
+    Generate the journey summary and each crew member's log using Gemini, streaming.
+    
+    Requests run concurrently on a small worker pool, under the model's shared rate
+    limit, and transient API errors are retried. Responses are streamed, and every
+    chunk received is passed on as soon as it arrives.
+    
+    Args:
+        crew_data: Output of build_crew_data
+        keys: Entries to generate (None for the summary, or member names); defaults to all
+        max_workers: Most requests in flight at once
+    
+    Yields:
+        (key, text, finished, error) tuples, where key is None for the summary or a
+        member's name and text is everything received so far for that key (a retry
+        starts it again from scratch). The last event for each key has finished
+        set, and error set instead of text if the request failed.
+    """
+    # Shared Gemini client and rate limit, built once per process
+    model = get_model(CREW_LOG_MODEL, site="crew_log")
+    limiter = get_rate_limiter(CREW_LOG_MODEL)
+    events = queue.Queue()
     
-    # Initialize Gemini
-    key = os.getenv("KEY")
-    genai.configure(api_key=key)
-    model = genai.GenerativeModel('gemini-1.5-pro')
+    def generate(key, prompt):
+        def attempt():
+            text = ""
+            site = "crew_summary" if key is None else "crew_log"
+            for chunk in model.generate_content(prompt, stream=True, site=site):
+                text += chunk.text
+                events.put((key, text, False, None))
+            return text
+        
+        try:
+            events.put((key, call_with_retries(attempt, limiter), True, None))
+        except Exception as e:
+            events.put((key, None, True, str(e)))
     
-    # Generate overall journey summary
+    # The summary and the logs don't depend on each other, so they all go out at once
+    # and wall time is roughly the slowest single call rather than the sum
+    if keys is None:
+        keys = [None, *crew_data]
+    prompts = {key: _summary_prompt(crew_data) if key is None else _log_prompt(key, crew_data) for key in keys}
+    
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for key, prompt in prompts.items():
+            executor.submit(generate, key, prompt)
+        
+        # Block on the queue rather than polling; every request ends with a finished event
+        pending = len(prompts)
+        while pending:
+            event = events.get()
+            if event[2]:
+                pending -= 1
+            yield event
+    finally:
+        # Abandoned early: don't start anything still queued
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def generate_crew_logs(crew_stats, crew_members, max_workers=CREW_LOG_WORKERS):
+    """
+    Generate narrative logs for each crew member, waiting for all of them.
+    
+    If some requests fail, the rest are returned and the failures are reported in 'errors'.
+    
+    Returns:
+        Dict with 'summary' (None if it failed), 'logs' (member -> text) and
+        'errors' (member or 'summary' -> message)
+    """
+    with closing(connect()) as conn:
+        crew_data = build_crew_data(conn, crew_stats, crew_members)
+    
+    results, errors = {}, {}
+    for key, text, finished, error in stream_crew_logs(crew_data, max_workers=max_workers):
+        if error is not None:
+            errors[key if key is not None else 'summary'] = error
+        elif finished:
+            results[key] = text
+    
+    return {
+        'summary': results.get(None),
+        'logs': {member: results[member] for member in crew_members if member in results},
+        'errors': errors
+    }
+
+def _summary_prompt(crew_data):
+    """
+    Prompt for the overall journey summary.
+    """
     weather_condition = "sunny" if sum(float(data['stats']['avg_uv']) for data in crew_data.values())/len(crew_data) > 50 else "overcast"
-    summary_prompt = f"""
+    return f"""
     Write an intriguing, single-paragraph synopsis (like one you'd find on the back of a book) about today's botanical crew adventure.
     
     The crew consists of: {', '.join(f"{name} ({data['vocation']})" for name, data in crew_data.items())}.
@@ -138,15 +480,13 @@ def generate_crew_logs(positions_df, crew_members):
     Keep it concise (max 3-4 sentences) and make it feel like part of an ongoing magical expedition series.
     Don't resolve the central mystery - leave that for the individual logs to explore!
     """
-    
-    summary_response = model.generate_content(summary_prompt)
-    journey_summary = summary_response.text
-    
-    # Generate individual logs
-    crew_logs = {}
-    for member, data in crew_data.items():
-        # Create a rich context for each plant's perspective
-        log_prompt = f"""
+
+def _log_prompt(member, crew_data):
+    """
+    Prompt for one crew member's personal log.
+    """
+    data = crew_data[member]
+    return f"""
         Write a personal log entry from {member}'s perspective. They are a sentient plant with these traits:
         - Personality: {data['personality']}
         - Vocation: {data['vocation']}
@@ -162,30 +502,273 @@ def generate_crew_logs(positions_df, crew_members):
         
         Make it feel like a personal diary entry that adds a piece to the larger puzzle.
         """
+
+def _plant_tracks(positions_df):
+    """
+    Split calculated positions into contiguous NumPy arrays per plant.
+    
+    Args:
+        positions_df: Output of calculate_positions (sorted by plant and time)
+    
+    Returns:
+        Dict of plant name -> dict of arrays ('t', 'x', 'y', 'uv' and hover 'customdata')
+    """
+    plant_codes, plant_names = pd.factorize(positions_df['Name'])
+    starts = np.flatnonzero(np.diff(plant_codes, prepend=-1))
+    stops = np.append(starts[1:], len(plant_codes))
+    
+    times = positions_df['Timestamp'].to_numpy()
+    x = positions_df['X'].to_numpy()
+    y = positions_df['Y'].to_numpy()
+    uv = positions_df['UV Levels (%)'].to_numpy()
+    customdata = np.stack((
+        positions_df['UV Levels (%)'].to_numpy(),
+        positions_df['Timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S').to_numpy(),
+        positions_df['Rotation (°)'].to_numpy(),
+        positions_df['Distance Traveled (in)'].to_numpy()
+    ), axis=-1)
+    
+    return {
+        str(plant_names[plant_codes[start]]): {
+            't': times[start:stop],
+            'x': x[start:stop],
+            'y': y[start:stop],
+            'uv': uv[start:stop],
+            'customdata': customdata[start:stop],
+        }
+        for start, stop in zip(starts, stops)
+    }
+
+def _marker_trace(plant, color, x, y, customdata):
+    """
+    Plant marker at its current position (empty arrays hide it).
+    """
+    import plotly.graph_objects as go
+    return go.Scatter(
+        x=x,
+        y=y,
+        mode='markers+text',
+        name=plant,
+        text=plant,
+        textposition="top center",
+        marker=dict(
+            size=20,
+            symbol='circle',
+            color=color,
+            line=dict(
+                color=color,
+                width=2
+            )
+        ),
+        showlegend=True,
+        customdata=customdata if len(x) else None,
+        hovertemplate=(
+            "<b>%{customdata[1]}</b><br>" +
+            "Plant: " + plant + "<br>" +
+            "Position: (%{x:.2f}, %{y:.2f})<br>" +
+            "Rotation: %{customdata[2]}°<br>" +
+            "Distance: %{customdata[3]} inches<br>" +
+            "UV Level: %{customdata[0]:.1f}%<br>" +
+            "<extra></extra>"
+        )
+    )
+
+def _path_trace(plant, color, x, y):
+    """
+    Line through the given points of the plant's path.
+    """
+    import plotly.graph_objects as go
+    return go.Scatter(
+        x=x,
+        y=y,
+        mode='lines',
+        name=plant,
+        line=dict(
+            color=color,
+            width=2,
+            dash='solid'
+        ),
+        opacity=0.4,
+        showlegend=False,  # Hide lines from legend
+        hoverinfo='skip'
+    )
+
+def _path_significance(x, y, tolerance):
+    """
+    Douglas-Peucker simplification of a path, for every tolerance from `tolerance` up.
+    
+    A larger tolerance only stops the recursion sooner, so a point is kept at any
+    tolerance below the smallest split distance on its way down the recursion.
+    The path is simplified once and np.flatnonzero(significance > t) gives the
+    points to keep at tolerance t, so no dropped point is further than t from
+    the simplified line.
+    
+    Returns:
+        Array of each point's significance: infinite for the ends, 0 for points
+        dropped even at `tolerance`
+    """
+    significance = np.zeros(len(x))
+    if len(x) < 3 or tolerance <= 0:
+        significance[:] = np.inf
+        return significance
+    
+    significance[0] = significance[-1] = np.inf
+    stack = [(0, len(x) - 1, np.inf)]
+    while stack:
+        first, last, parent = stack.pop()
+        if last - first < 2:
+            continue
+        
+        # Perpendicular distance of the points in between from the first-last segment
+        dx, dy = x[last] - x[first], y[last] - y[first]
+        px, py = x[first + 1:last] - x[first], y[first + 1:last] - y[first]
+        length = np.hypot(dx, dy)
+        distances = np.abs(dx * py - dy * px) / length if length > 0 else np.hypot(px, py)
         
-        log_response = model.generate_content(log_prompt)
-        crew_logs[member] = log_response.text
+        farthest = np.argmax(distances)
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            significance[split] = min(distances[farthest], parent)
+            stack.append((first, split, significance[split]))
+            stack.append((split, last, significance[split]))
+    return significance
+
+def _frame_times(timestamps, max_frames):
+    """
+    Times to draw frames at: every timestamp if there are few enough, otherwise
+    the ends of `max_frames` equal-width buckets.
+    
+    Returns:
+        (frame times, bucket width)
+    """
+    if len(timestamps) <= max_frames:
+        return timestamps, np.timedelta64(0, 's')
+    
+    span_seconds = (timestamps[-1] - timestamps[0]) / np.timedelta64(1, 's')
+    width = np.timedelta64(int(np.ceil(span_seconds / (max_frames - 1))), 's')
+    return timestamps[0] + width * np.arange(max_frames), width
+
+def _align_track(track, frame_times, bucket):
+    """
+    Resample a plant's path onto the frame times.
+
+    Robots report on their own schedules, so a frame time rarely matches one of
+    the plant's readings. Each frame instead gets the plant's position
+    interpolated between the readings either side of it, or held at the last
+    reading once there's no next one (an as-of join). A plant is hidden before
+    its first reading, and once it's been quiet for STALE_INTERVALS of its usual
+    reporting intervals (and at least one frame bucket).
+
+    Args:
+        track: One plant's arrays from _plant_tracks
+        frame_times: Sorted frame times
+        bucket: Frame bucket width (see _frame_times)
+
+    Returns:
+        Dict of per-frame arrays: 'row' (index of the latest reading, -1 before
+        the first), 'x' and 'y' (the aligned position) and 'visible'
+    """
+    times = track['t']
+    intervals = np.diff(times)
+    stale_after = max(STALE_INTERVALS * np.median(intervals) if len(intervals) else np.timedelta64(0, 's'), bucket)
+
+    ends = np.searchsorted(times, frame_times, side='right')
+    row = ends - 1
+    previous = np.maximum(row, 0)
+    following = np.minimum(ends, len(times) - 1)
+
+    # Interpolate only across gaps short enough that the plant was still reporting
+    since = frame_times - times[previous]
+    gap = times[following] - times[previous]
+    between = (row >= 0) & (ends < len(times)) & (gap <= stale_after) & (gap > np.timedelta64(0, 's'))
+    weight = np.zeros(len(frame_times))
+    weight[between] = since[between] / gap[between]
+
+    x, y = track['x'], track['y']
+    return {
+        'row': row,
+        'x': x[previous] + weight * (x[following] - x[previous]),
+        'y': y[previous] + weight * (y[following] - y[previous]),
+        'visible': (row >= 0) & (since <= stale_after),
+    }
+
+def _plan_frames(significance, aligned, frame_count, tolerance):
+    """
+    Work out which points every frame shows, and roughly how big the figure will be.
+    
+    Args:
+        significance: Per-plant arrays from _path_significance
+        aligned: Per-plant aligned positions from _align_track
+        frame_count: Number of frames they're aligned to
+        tolerance: Simplification tolerance
+    
+    Returns:
+        (per-plant indices of simplified path points, estimated bytes)
+    """
+    kept, points = {}, 0
+    for plant, plant_significance in significance.items():
+        kept[plant] = np.flatnonzero(plant_significance > tolerance)
+        
+        # Each frame's path is the simplified history plus the current reading, the
+        # aligned position and the marker
+        rows = aligned[plant]['row']
+        started = rows >= 0
+        points += np.searchsorted(kept[plant], rows[started]).sum() + 3 * started.sum()
+    
+    traces = 2 * len(significance) * (frame_count + 1)
+    return kept, POINT_BYTES * points + TRACE_BYTES * traces
+
+def _light_map_trace(light_map):
+    """
+    Heatmap of mean UV per cell (peak UV on hover), drawn underneath the paths.
+    """
+    import plotly.graph_objects as go
+    return go.Heatmap(**_light_map_data(light_map), name='Light map', hoverongaps=False, zsmooth=False,
+                      colorscale='YlOrRd', opacity=0.45, colorbar=dict(title='UV %', x=-0.15),
+                      hovertemplate='Mean UV: %{z:.1f}%<br>Peak UV: %{customdata:.1f}%<extra></extra>')
+
+def _light_map_data(light_map):
+    """
+    Heatmap grid values from a UVGrid, with empty cells as None (gaps).
+    """
+    def cells(values):
+        return np.where(np.isnan(values), None, np.round(values, 2)).tolist()
     
-    conn.close()
     return {
-        'summary': journey_summary,
-        'logs': crew_logs
+        'z': cells(light_map.mean()),
+        'customdata': cells(light_map.maximum()),
+        'x0': light_map.x0(),
+        'y0': light_map.y0(),
+        'dx': light_map.cell_size,
+        'dy': light_map.cell_size,
     }
 
-def create_movement_visualization(positions_df, plants, plant_images_dir):
+def create_movement_visualization(positions_df, plants, plant_images_dir, max_frames=MAX_FRAMES, max_bytes=MAX_FIGURE_BYTES, light_map=None):
     """
     Create an animated visualization of plant movements.
     
+    Long recordings are bucketed into at most `max_frames` frames and the paths
+    drawn in each frame are simplified, so the figure's size stays bounded. Each
+    plant's path is resampled onto the frame times (see _align_track), so plants
+    reporting at different times all keep a marker in every frame.
+    
     Args:
-        positions_df: DataFrame with columns ['Name', 'Timestamp', 'Rotation (°)', 'Distance Traveled (in)', 'UV Levels (%)']
+        positions_df: DataFrame with columns ['Name', 'Timestamp', 'Rotation (°)', 'Distance Traveled (in)', 'UV Levels (%)'], plus X and Y if already calculated
         plants: List of plant names
         plant_images_dir: Directory containing plant images named as plant_name.jpg
+        max_frames: Most animation frames (and slider steps) to generate
+        max_bytes: Approximate budget for the serialized figure
+        light_map: Optional UVGrid to draw underneath the paths
     
     Returns:
         plotly.graph_objects.Figure
     """
-    # Calculate X and Y positions
-    positions_df = calculate_positions(positions_df)
+    # Plotly is only loaded once a figure is actually built, not on cache hits
+    import plotly.graph_objects as go
+    
+    # Calculate X and Y positions (unless they were kept from an earlier refresh)
+    with section("calculate_positions"):
+        positions_df = ensure_positions(positions_df)
     
     # Create figure with secondary y-axis
     fig = go.Figure()
@@ -196,132 +779,81 @@ def create_movement_visualization(positions_df, plants, plant_images_dir):
     x_range = [all_x.min() - 1, all_x.max() + 1]
     y_range = [all_y.min() - 1, all_y.max() + 1]
     
-    # Get first timestamp data for initial state
-    first_timestamp = positions_df['Timestamp'].min()
-    initial_points = positions_df[positions_df['Timestamp'] == first_timestamp]
+    # Group once into contiguous per-plant arrays; frames are then just slices
+    tracks = _plant_tracks(positions_df)
+    timestamps = np.unique(positions_df['Timestamp'].to_numpy())
     
-    # Add traces for each plant
-    for idx, plant in enumerate(plants):
-        plant_color = COLORS[idx % len(COLORS)]
-        plant_initial = initial_points[initial_points['Name'] == plant]
-        
-        # Add plant markers first (so they appear in legend)
-        fig.add_trace(
-            go.Scatter(
-                x=plant_initial['X'],
-                y=plant_initial['Y'],
-                mode='markers+text',
-                name=plant,
-                text=plant,
-                textposition="top center",
-                marker=dict(
-                    size=20,
-                    symbol='circle',
-                    color=plant_color,
-                    line=dict(
-                        color=plant_color,
-                        width=2
-                    )
-                ),
-                showlegend=True,
-                customdata=np.stack((
-                    plant_initial['UV Levels (%)'],
-                    plant_initial['Timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S'),
-                    plant_initial['Rotation (°)'],
-                    plant_initial['Distance Traveled (in)']
-                ), axis=-1),
-                hovertemplate=(
-                    "<b>%{customdata[1]}</b><br>" +
-                    "Plant: " + plant + "<br>" +
-                    "Position: (%{x:.2f}, %{y:.2f})<br>" +
-                    "Rotation: %{customdata[2]}°<br>" +
-                    "Distance: %{customdata[3]} inches<br>" +
-                    "UV Level: %{customdata[0]:.1f}%<br>" +
-                    "<extra></extra>"
-                )
-            )
-        )
-        
-        # Add connecting lines (empty at first)
-        fig.add_trace(
-            go.Scatter(
-                x=plant_initial['X'],
-                y=plant_initial['Y'],
-                mode='lines',
-                name=plant,
-                line=dict(
-                    color=plant_color,
-                    width=2,
-                    dash='solid'
-                ),
-                opacity=0.4,
-                showlegend=False,  # Hide lines from legend
-                hoverinfo='skip'
-            )
-        )
-
-    # Create frames for animation
+    # Keep the figure under the byte budget: simplify paths harder first, then use fewer frames
+    # Paths are simplified once for every tolerance tried, and only realigned when
+    # the number of frames changes
+    diagonal = np.hypot(x_range[1] - x_range[0], y_range[1] - y_range[0])
+    tolerance = SIMPLIFY_TOLERANCE * diagonal
+    significance = {plant: _path_significance(track['x'], track['y'], tolerance)
+                    for plant, track in tracks.items()}
+    aligned = None
+    while True:
+        if aligned is None:
+            frame_times, bucket = _frame_times(timestamps, max_frames)
+            aligned = {plant: _align_track(track, frame_times, bucket) for plant, track in tracks.items()}
+        kept, size = _plan_frames(significance, aligned, len(frame_times), tolerance)
+        if size <= max_bytes or max_frames <= 2:
+            break
+        if tolerance < MAX_SIMPLIFY_TOLERANCE * diagonal:
+            tolerance *= 2
+        else:
+            max_frames //= 2
+            aligned = None
+    
+    def frame_traces(frame_idx):
+        markers, paths = [], []
+        empty = np.empty(0)
+        for idx, plant in enumerate(plants):
+            color = COLORS[idx % len(COLORS)]
+            track = tracks.get(plant)
+            row = aligned[plant]['row'][frame_idx] if track is not None else -1
+            
+            if row < 0:
+                markers.append(_marker_trace(plant, color, empty, empty, None))
+                paths.append(_path_trace(plant, color, empty, empty))
+                continue
+            
+            # Marker at the plant's aligned position, hover showing its latest reading
+            x = aligned[plant]['x'][frame_idx:frame_idx + 1]
+            y = aligned[plant]['y'][frame_idx:frame_idx + 1]
+            if aligned[plant]['visible'][frame_idx]:
+                markers.append(_marker_trace(plant, color, x, y, track['customdata'][row:row + 1]))
+            else:
+                markers.append(_marker_trace(plant, color, empty, empty, None))
+            
+            # Simplified history up to the latest reading, then on to the marker
+            history = kept[plant][:np.searchsorted(kept[plant], row)]
+            points = np.append(history, row)
+            paths.append(_path_trace(plant, color,
+                                     np.append(track['x'][points], x), np.append(track['y'][points], y)))
+        return markers, paths
+    
+    # The light map is static, so it goes first and frames only touch the traces after it
+    first_animated = 0
+    if light_map is not None and light_map.rows:
+        fig.add_trace(_light_map_trace(light_map))
+        first_animated = 1
+    
+    # Initial state: the first frame. Traces are in the same order as in every
+    # frame (all markers, then all paths) since frames update traces by position.
+    initial_markers, initial_paths = frame_traces(0)
+    fig.add_traces([*initial_markers, *initial_paths])
+    animated = list(range(first_animated, first_animated + 2 * len(plants)))
+    
+    # Create frames for animation, showing cumulative paths
     frames = []
-    timestamps = positions_df['Timestamp'].unique()
-    for timestamp in timestamps:
-        frame_data = positions_df[positions_df['Timestamp'] <= timestamp]  # Show cumulative paths
-        current_points = positions_df[positions_df['Timestamp'] == timestamp]
-        
-        frame = go.Frame(
-            data=[
-                # Add markers first (for legend consistency)
-                *[go.Scatter(
-                    x=current_points[current_points['Name'] == plant]['X'],
-                    y=current_points[current_points['Name'] == plant]['Y'],
-                    mode='markers+text',
-                    name=plant,
-                    text=plant,
-                    textposition="top center",
-                    marker=dict(
-                        size=20,
-                        symbol='circle',
-                        color=COLORS[idx % len(COLORS)],
-                        line=dict(
-                            color=COLORS[idx % len(COLORS)],
-                            width=2
-                        )
-                    ),
-                    showlegend=True,
-                    customdata=np.stack((
-                        current_points[current_points['Name'] == plant]['UV Levels (%)'],
-                        current_points[current_points['Name'] == plant]['Timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S'),
-                        current_points[current_points['Name'] == plant]['Rotation (°)'],
-                        current_points[current_points['Name'] == plant]['Distance Traveled (in)']
-                    ), axis=-1) if not current_points[current_points['Name'] == plant].empty else None,
-                    hovertemplate=(
-                        "<b>%{customdata[1]}</b><br>" +
-                        "Plant: " + plant + "<br>" +
-                        "Position: (%{x:.2f}, %{y:.2f})<br>" +
-                        "Rotation: %{customdata[2]}°<br>" +
-                        "Distance: %{customdata[3]} inches<br>" +
-                        "UV Level: %{customdata[0]:.1f}%<br>" +
-                        "<extra></extra>"
-                    )
-                ) for idx, plant in enumerate(plants)],
-                # Add lines for paths
-                *[go.Scatter(
-                    x=frame_data[frame_data['Name'] == plant]['X'],
-                    y=frame_data[frame_data['Name'] == plant]['Y'],
-                    mode='lines',
-                    name=plant,
-                    line=dict(
-                        color=COLORS[idx % len(COLORS)],
-                        width=2,
-                        dash='solid'
-                    ),
-                    opacity=0.4,
-                    showlegend=False,
-                    hoverinfo='skip'
-                ) for idx, plant in enumerate(plants)]
-            ],
-            name=timestamp.strftime('%Y-%m-%d %H:%M:%S')
-        )
-        frames.append(frame)
+    with section("Build frames"):
+        for frame_idx, frame_time in enumerate(frame_times):
+            markers, paths = frame_traces(frame_idx)
+            frames.append(go.Frame(
+                data=[*markers, *paths],
+                traces=animated,
+                name=pd.Timestamp(frame_time).strftime('%Y-%m-%d %H:%M:%S')
+            ))
     
     # Update figure layout
     fig.update_layout(
@@ -397,13 +929,79 @@ def create_movement_visualization(positions_df, plants, plant_images_dir):
     
     return fig
 
-def display_crew_logs(positions_df, crew_members):
+def _encode_array(values, dtype):
+    """
+    Base64 of an array's raw little-endian bytes, for decoding into a JS typed array.
     """
-    Display the crew logs in Streamlit with engaging teasers during generation.
+    return base64.b64encode(np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<')).tobytes()).decode('ascii')
+
+def create_client_animation_html(positions_df, plants, height=600, light_map=None):
+    """
+    Build a self-contained HTML Wayfinder that animates in the browser.
+    
+    Each plant's full path is sent once as compact typed arrays and drawn with WebGL
+    (Scattergl) traces; the browser reveals paths and moves markers from a time
+    cursor. The payload grows linearly with the number of readings, unlike Plotly
+    frames which repeat every path in every frame.
+    
+    Args:
+        positions_df: DataFrame with columns ['Name', 'Timestamp', 'Rotation (°)', 'Distance Traveled (in)', 'UV Levels (%)'], plus X and Y if already calculated
+        plants: List of plant names
+        height: Plot height in pixels
+        light_map: Optional UVGrid to draw underneath the paths
+    
+    Returns:
+        HTML string for components.html
+    """
+    if positions_df.empty:
+        # Nothing to animate (and no time range to animate over)
+        return CLIENT_EMPTY_HTML
+    
+    positions_df = ensure_positions(positions_df)
+    tracks = _plant_tracks(positions_df)
+    
+    payload_plants = []
+    for idx, plant in enumerate(plants):
+        track = tracks.get(plant)
+        if track is None:
+            continue
+        seconds = track['t'].astype('datetime64[ms]').astype(np.int64) / 1000
+        payload_plants.append({
+            'name': plant,
+            'color': COLORS[idx % len(COLORS)],
+            't': _encode_array(seconds, np.float64),
+            'x': _encode_array(track['x'], np.float32),
+            'y': _encode_array(track['y'], np.float32),
+            'uv': _encode_array(track['uv'], np.float32),
+        })
+    
+    times = positions_df['Timestamp']
+    payload = {
+        'plants': payload_plants,
+        't_start': times.min().timestamp(),
+        't_end': times.max().timestamp(),
+        'x_range': [float(positions_df['X'].min()) - 1, float(positions_df['X'].max()) + 1],
+        'y_range': [float(positions_df['Y'].min()) - 1, float(positions_df['Y'].max()) + 1],
+        'duration_ms': CLIENT_PLAYBACK_MS,
+        'light_map': _light_map_data(light_map) if light_map is not None and light_map.rows else None,
+    }
+    
+    # Keep "</script>" inside names from closing the data block
+    payload_json = json.dumps(payload).replace('</', '<\\/')
+    return (CLIENT_ANIMATION_TEMPLATE
+            .replace('__HEIGHT__', str(height))
+            .replace('__PAYLOAD__', payload_json))
+
+def display_crew_logs(crew_stats, crew_members, voyage_day):
+    """
+    Display the crew logs in Streamlit, streaming each entry in as it's written.
+    
+    Entries are saved per day and reused while the crew's stats and profiles are
+    unchanged; only missing entries are generated unless the user asks to regenerate.
     """
     st.markdown("<h2 style='text-align: center;'>🌿 Crew Entries 🌿</h2>", unsafe_allow_html=True)
     
-    # Teaser messages that cycle during generation
+    # Teaser messages that cycle as entries arrive
     teasers = [
         "📡 Intercepting whispers from the botanical network...",
         "🌱 Decoding chlorophyll-encoded messages...",
@@ -417,65 +1015,146 @@ def display_crew_logs(positions_df, crew_members):
         "🎭 Channeling voices of the verdant crew..."
     ]
     
-    if st.button("📡 Retrieve Crew Entries", use_container_width=True):
-        # Create placeholder for teaser messages
-        teaser_placeholder = st.empty()
-        
-        # Start generating logs in a separate thread
-        import threading
-        logs = [None]  # Use list to store result from thread
-        
-        def generate():
-            logs[0] = generate_crew_logs(positions_df, crew_members)
-        
-        thread = threading.Thread(target=generate)
-        thread.start()
-        
-        # Display cycling teasers until logs are ready
-        while thread.is_alive():
-            for teaser in teasers:
-                if not thread.is_alive():
-                    break
-                with teaser_placeholder:
-                    st.info(teaser)
-                    time.sleep(0.5)
+    # One crew lookup shared by the prompts, the fingerprint and the expander titles
+    with closing(connect()) as conn:
+        crew_data = build_crew_data(conn, crew_stats, crew_members)
+        fingerprint = crew_log_fingerprint(voyage_day, crew_data, CREW_LOG_MODEL)
+        saved = load_crew_logs(conn, voyage_day, fingerprint)
+    
+    wanted = [None, *crew_members]
+    missing = [key for key in wanted if key not in saved]
+    if missing:
+        keys = missing if st.button("📡 Retrieve Crew Entries", use_container_width=True) else []
+    else:
+        keys = wanted if st.button("🔄 Regenerate Crew Entries", use_container_width=True) else []
+    
+    if not saved and not keys:
+        return
+    
+    # Status line, advanced as entries arrive
+    teaser_placeholder = st.empty()
+    if keys:
+        teaser_placeholder.info(teasers[0])
+    
+    st.markdown("### 📜 Journey Summary")
+    summary_placeholder = st.empty()
+    if None in saved:
+        summary_placeholder.write(saved[None])
+    
+    st.markdown("### 👥 Individual Crew Perspectives")
+    
+    # One expander per member, filled in as its log streams in
+    log_placeholders = {}
+    for member in crew_members:
+        title = crew_data[member]['title'] or DEFAULT_PROFILE['title']
+        with st.expander(f"📝 Log of {member}, {title}"):
+            log_placeholders[member] = st.empty()
+            if member in saved:
+                log_placeholders[member].write(saved[member])
+    
+    if not keys:
+        return
+    
+    # Updates are driven by arriving chunks; nothing polls or sleeps
+    completed, errors = 0, {}
+    with closing(connect()) as conn:
+        for key, text, finished, error in stream_crew_logs(crew_data, keys):
+            placeholder = summary_placeholder if key is None else log_placeholders[key]
+            if error is not None:
+                errors[key if key is not None else 'summary'] = error
+                placeholder.caption("Lost in transmission.")
+            else:
+                placeholder.write(text)
         
-        # Clear the teaser and show success
-        teaser_placeholder.empty()
+            if finished:
+                completed += 1
+                if error is None:
+                    save_crew_log(conn, voyage_day, fingerprint, key, text)
+                teaser_placeholder.info(f"{teasers[completed % len(teasers)]} ({completed}/{len(keys)})")
+    
+    # Clear the teaser and show success
+    teaser_placeholder.empty()
+    if not errors:
         st.success("✨ Crew logs successfully retrieved!")
-        
-        st.markdown("### 📜 Journey Summary")
-        st.write(logs[0]['summary'])
-        
-        st.markdown("### 👥 Individual Crew Perspectives")
-        # Connect to the database to get titles
-        conn = sqlite3.connect("plant_db.db", check_same_thread=False)
-        c = conn.cursor()
-        
-        for member, log_data in logs[0]['logs'].items():
-            # Get the title from the database
-            title_result = c.execute("SELECT title FROM plants WHERE name = ?", (member,)).fetchone()
-            title = title_result[0] if title_result and title_result[0] else "Wandering Plant"
-            
-            with st.expander(f"📝 Log of {member}, {title}"):
-                st.write(log_data)
-        
-        conn.close()
+    for failed, error in errors.items():
+        st.warning(f"Couldn't retrieve the entry for {failed}: {error}")
+
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    """
+    Process-wide Wayfinder cache, shared by every session.
+    """
+    return FigureCache()
+
+class _FigureJSON:
+    """
+    How FigureCache writes Frames figures to disk and reads them back.
+    """
+    @staticmethod
+    def dumps(fig):
+        return fig.to_json()
+    
+    @staticmethod
+    def loads(text):
+        import plotly.io as pio
+        return pio.from_json(text)
 
-def display_movement_visualization(positions_df, plants, plant_images_dir):
+def build_wayfinder(positions_df, plants, plant_images_dir, client_side=False, light_map=None):
+    """
+    Render the Wayfinder for caching: a self-contained HTML page in client-side
+    mode, otherwise the Plotly figure.
+    """
+    if client_side:
+        return create_client_animation_html(positions_df, plants, height=WAYFINDER_HEIGHT, light_map=light_map)
+    
+    fig = create_movement_visualization(positions_df, plants, plant_images_dir, light_map=light_map)
+    fig.update_layout(height=WAYFINDER_HEIGHT)
+    return fig
+
+def display_movement_visualization(positions_df, plants, plant_images_dir, client_side=False, light_map=None, data_key=None):
     """
     Display the plant movement visualization in Streamlit.
     
+    The rendered figure is cached under the data's identity, the plant list and
+    the options, so revisiting the tab with unchanged data skips building it. The
+    cache keeps the Plotly figure itself, so a hit doesn't parse or validate it again.
+    Frames are drawn with st.plotly_chart (Streamlit's bundled Plotly and theme);
+    client-side mode is a separate page that loads Plotly from its CDN.
+    
     Args:
-        positions_df: DataFrame with columns ['Name', 'Timestamp', 'Rotation (°)', 'Distance Traveled (in)', 'UV Levels (%)']
+        positions_df: DataFrame with columns ['Name', 'Timestamp', 'Rotation (°)', 'Distance Traveled (in)', 'UV Levels (%)'], plus X and Y if already calculated
         plants: List of plant names
         plant_images_dir: Directory containing plant images named as plant_name.jpg
+        client_side: Animate in the browser from each path sent once, instead of with Plotly frames
+        light_map: Optional UVGrid of the same rows, drawn underneath the paths
+        data_key: Short identifier of the rows, e.g. (database, day, revision);
+            without one the rows themselves are hashed
     """
-    # Convert Timestamp column to datetime if it's not already
-    positions_df['Timestamp'] = pd.to_datetime(positions_df['Timestamp'])
+    cache = get_figure_cache()
+    with section("Figure cache lookup"):
+        key = figure_key(positions_df if data_key is None else data_key, plants, {
+            'client_side': client_side,
+            'max_frames': MAX_FRAMES,
+            'max_bytes': MAX_FIGURE_BYTES,
+            # The grid is derived from the same rows, so its settings are all the key needs
+            'light_map_cell': light_map.cell_size if light_map is not None else None,
+        })
+        codec = None if client_side else _FigureJSON
+        rendered = cache.get(key, codec)
     
-    # Create the visualization figure
-    fig = create_movement_visualization(positions_df, plants, plant_images_dir)
+    if rendered is None:
+        # Convert Timestamp column to datetime if it's not already
+        if not pd.api.types.is_datetime64_any_dtype(positions_df['Timestamp']):
+            positions_df = positions_df.assign(Timestamp=pd.to_datetime(positions_df['Timestamp']))
+        
+        with section("Build Wayfinder"):
+            rendered = build_wayfinder(positions_df, plants, plant_images_dir, client_side, light_map)
+        # Figures are built to fit the byte budget, so that's what they count for in
+        # the cache without serializing them just to measure
+        cache.put(key, rendered, None if client_side else MAX_FIGURE_BYTES, codec)
     
     # Display the figure in Streamlit
-    st.plotly_chart(fig, use_container_width=True) 
\ No newline at end of file
+    if client_side:
+        components.html(rendered, height=WAYFINDER_HEIGHT + 80)
+    else:
+        st.plotly_chart(rendered, use_container_width=True)
@@ -0,0 +1,109 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+# Profile fields in the order they appear in the Roster Manager
+PROFILE_FIELDS = ['name', 'title', 'personality', 'vocation', 'vessel', 'adventure']
+
+# What to write for each field that's left empty
+FIELD_INSTRUCTIONS = {
+    'name': "A character name that would fit in a fictional book of any genre - sci-fi, fantasy, detective, romance, or literary fiction. The name should reflect their background and personality. Just the name, no explanation.",
+    'title': "A title or epithet (2-4 words) that reflects their role or nature (e.g. 'Cosmic Navigator', 'Keeper of Ancient Whispers'). The title should be poetic and mysterious while staying true to the character's established identity. Just the title, no explanation.",
+    'personality': "A compelling description of their personality in 2-3 clear sentences. Focus on their unique traits, quirks, and what makes them memorable.",
+    'vocation': "Their profession or calling in 2-3 clear sentences. Focus on what they do and why they're passionate about it.",
+    'vessel': "Their signature mode of transport in 2-3 clear sentences. It can be unconventional. Make it unique and fitting to their personality, title, and vocation.",
+    'adventure': "A defining adventure or moment in their life in 2-3 clear sentences. Make it exciting and revealing while incorporating their established traits, title, and vocation.",
+}
+
+CHARACTER_BRIEF = "Create a character for a sentient plant. Focus on creating a believable persona that could be from any genre of fictional work - sci-fi, fantasy, detective, romance, or literary fiction. Always provide definitive statements, never questions. The character should maintain consistent identity and personality traits throughout all descriptions."
+
+def missing_fields(current_values):
+    """
+    Profile fields that are empty or only whitespace.
+    """
+    return [field for field in PROFILE_FIELDS if not (current_values.get(field) or "").strip()]
+
+def _context_prompt(current_values):
+    """
+    Describe the traits the user has already filled in.
+    """
+    prompt = CHARACTER_BRIEF
+    existing = {field: value for field, value in current_values.items() if value and value.strip()}
+    if existing:
+        prompt += "\nMaintain absolute consistency with these existing traits:\n"
+        for field, value in existing.items():
+            prompt += f"- {field}: {value}\n"
+    return prompt
+
+def _profile_schema(fields):
+    """
+    JSON schema asking for one string per missing field.
+    """
+    return {
+        'type': 'OBJECT',
+        'properties': {field: {'type': 'STRING'} for field in fields},
+        'required': fields,
+    }
+
+def _validate_profile(profile, fields):
+    """
+    Check a structured response has a non-empty string for every requested field.
+
+    Raises:
+        ValueError: If the response isn't an object or a field is missing or blank
+    """
+    if not isinstance(profile, dict):
+        raise ValueError("Profile response is not a JSON object")
+
+    validated = {}
+    for field in fields:
+        value = profile.get(field)
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"Profile response is missing '{field}'")
+        validated[field] = value.strip().strip('"')
+    return validated
+
+def _generate_field(model, context, field):
+    """
+    Generate a single field with its own stateless request.
+    """
+    response = model.generate_content(
+        f"{context}\nWrite the character's {field}: {FIELD_INSTRUCTIONS[field]}"
+    )
+    return response.text.strip()
+
+def generate_profile(model, current_values):
+    """
+    Fill in every empty profile field with a single structured request.
+
+    All missing fields are requested together as one JSON object, so the traits
+    stay consistent without a chat history. If the response can't be parsed, the
+    fields are requested individually and in parallel instead.
+
+    Args:
+        model: llm.Model from get_model (Gemini or the local stand-in)
+        current_values: Dict of profile field -> value entered so far
+
+    Returns:
+        Dict of generated values for the fields that were empty
+    """
+    fields = missing_fields(current_values)
+    if not fields:
+        return {}
+
+    context = _context_prompt(current_values)
+    instructions = "\n".join(f"- {field}: {FIELD_INSTRUCTIONS[field]}" for field in fields)
+
+    try:
+        response = model.generate_content(
+            f"{context}\nRespond with a JSON object containing these fields:\n{instructions}",
+            generation_config={
+                'response_mime_type': 'application/json',
+                'response_schema': _profile_schema(fields),
+            }
+        )
+        return _validate_profile(json.loads(response.text), fields)
+    except ValueError:
+        # Covers malformed JSON, blank fields and blocked responses
+        with ThreadPoolExecutor(max_workers=len(fields)) as executor:
+            futures = {field: executor.submit(_generate_field, model, context, field) for field in fields}
+            return {field: future.result() for field, future in futures.items()}
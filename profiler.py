@@ -0,0 +1,204 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Reruns kept per session for the profiler panel
+PROFILE_HISTORY = 50
+
+# Distinct queries kept per rerun, slowest first
+TOP_QUERIES = 15
+
+# The run being profiled on this thread (each script run and fragment rerun has its own)
+_active = threading.local()
+
+def profiling_enabled():
+    """
+    Opt in for every session with SUNRUN_PROFILE=1, or for one session with ?profile=1.
+    """
+    return os.getenv("SUNRUN_PROFILE") == "1" or st.query_params.get("profile") == "1"
+
+def _current_run():
+    return getattr(_active, 'run', None)
+
+def _history():
+    if 'profiler_runs' not in st.session_state:
+        st.session_state.profiler_runs = deque(maxlen=PROFILE_HISTORY)
+    return st.session_state.profiler_runs
+
+@contextmanager
+def profiled_run(name="app", imports_started=None):
+    """
+    Profile everything inside as one rerun and add it to this session's history.
+
+    Does nothing unless profiling is enabled.
+
+    Args:
+        name: Label for the run
+        imports_started: perf_counter() taken before the script's imports, to
+            include them as an "Imports" section (their cost on a cold start)
+    """
+    if get_script_run_ctx() is None or not profiling_enabled():
+        yield
+        return
+
+    run = {'name': name, 'started': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+           'sections': [], 'queries': [], 'stack': []}
+    _active.run = run
+    start = time.perf_counter()
+    if imports_started is not None:
+        run['sections'].append({'section': 'Imports', 'ms': round((start - imports_started) * 1000, 2)})
+        start = imports_started
+    try:
+        yield
+    finally:
+        _active.run = None
+        run['total_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        del run['stack']
+        run['queries'] = _summarize_queries(run['queries'])
+        _history().append(run)
+
+@contextmanager
+def section(name):
+    """
+    Time a section of the current rerun. Nested sections are recorded as "outer/inner".
+
+    A section reached outside a profiled rerun (a fragment rerunning on its own)
+    is profiled as a rerun of its own.
+    """
+    run = _current_run()
+    if run is None:
+        if get_script_run_ctx() is None:
+            yield
+            return
+        with profiled_run(name):
+            if _current_run() is None:
+                yield
+            else:
+                with section(name):
+                    yield
+        return
+
+    run['stack'].append(name)
+    path = '/'.join(run['stack'])
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run['sections'].append({'section': path, 'ms': round((time.perf_counter() - start) * 1000, 2)})
+        run['stack'].pop()
+
+def profiled(name):
+    """
+    Decorator form of section(), for whole functions such as fragments.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with section(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _summarize_queries(queries):
+    """
+    Group a run's queries by statement: count and total time, slowest first.
+    """
+    totals = {}
+    for sql, ms in queries:
+        statement = re.sub(r'\s+', ' ', sql).strip()[:200]
+        count, total = totals.get(statement, (0, 0.0))
+        totals[statement] = (count + 1, total + ms)
+    ranked = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)
+    return [{'query': statement, 'count': count, 'ms': round(total, 2)}
+            for statement, (count, total) in ranked[:TOP_QUERIES]]
+
+class ProfiledCursor(sqlite3.Cursor):
+    """
+    Cursor that adds the time spent executing and fetching to the current rerun's profile.
+    """
+    _query = None
+
+    def _timed(self, method, *args):
+        run = _current_run()
+        if run is None:
+            return method(*args)
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            if method.__name__.startswith('execute'):
+                self._query = [args[0], elapsed]
+                run['queries'].append(self._query)
+            elif self._query is not None:
+                self._query[1] += elapsed
+
+    def execute(self, sql, parameters=()):
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(super().executemany, sql, seq_of_parameters)
+
+    def fetchone(self):
+        return self._timed(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed(super().fetchmany, size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        return self._timed(super().fetchall)
+
+class ProfiledConnection(sqlite3.Connection):
+    """
+    Connection whose cursors are ProfiledCursors. Costs one Python call per query when profiling is off.
+    """
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+def render_profiler_panel():
+    """
+    Developer panel with the last rerun's sections and queries, the rerun history and LLM usage.
+    """
+    if not profiling_enabled():
+        return
+    from llm import llm_usage
+
+    runs = list(_history())
+    with st.expander("⏱️ Rerun profiler", expanded=False):
+        if not runs:
+            st.caption("No reruns profiled yet.")
+            return
+
+        last = runs[-1]
+        st.markdown(f"**Last rerun** ({last['name']}, {last['started']}): {last['total_ms']:.0f} ms")
+        st.dataframe(last['sections'], use_container_width=True)
+        if last['queries']:
+            st.markdown("**Queries**")
+            st.dataframe(last['queries'], use_container_width=True)
+
+        st.markdown("**History**")
+        st.bar_chart({'total ms': [run['total_ms'] for run in runs]})
+
+        usage = llm_usage()
+        if usage['sites']:
+            st.markdown(f"**LLM usage** ({usage['requests_today']} requests, {usage['tokens_today']} tokens today)")
+            st.dataframe([{'site': site, **{k: v for k, v in stats.items() if k != 'latency_histogram'}}
+                          for site, stats in usage['sites'].items()], use_container_width=True)
+
+        st.download_button("Export JSON", json.dumps({'runs': runs, 'llm': usage}, indent=2),
+                           file_name="rerun_profile.json", mime="application/json")
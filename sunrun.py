@@ -9,20 +9,14 @@ from adafruit_motor import servo
 import random
 
 import os
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold  # Import only necessary types
-from google.generativeai import types
-from dotenv import load_dotenv, find_dotenv
 import streamlit as st
 import faiss
 import numpy as np
 from gtts import gTTS
+from llm import get_model
 
-key = os.getenv("KEY")
-genai.configure(api_key="YOUR API KEY HERE")
-model = genai.GenerativeModel("embedding-ada") 
-
-model = genai.GenerativeModel("gemini-2.0-flash")  # or whatever conversational model you prefer
+# Shared client layer: key from .env, timeouts, usage accounting and the offline backend
+model = get_model("gemini-2.0-flash", site="sunrun")  # or whatever conversational model you prefer
 
 def whimsical_plant_speak(prompt_hint):
     response = model.generate_content(